@@ -1,14 +1,22 @@
+import io
 import os
+import re
 import sys
 import json
+import math
 import stat
+import random
 import urllib
+import hashlib
 import shutil
 import zipfile
 import argparse
 import platform
+import itertools
+import contextlib
 import subprocess
 import urllib.request
+import concurrent.futures
 from pathlib import Path
 
 
@@ -100,6 +108,7 @@ def install_client(ver_data, version):
 # Constants
 SOURCE_DIR = Path("src")
 TEST_DIR = Path("test")
+CACHE_DIR = Path(".cache/matches")
 ENGINE_VER_DATA = {
     "name": "engine",
     "file": "engine_version.txt",
@@ -321,6 +330,203 @@ def run_game(args):
     run_game(game_args)
 
 
+def list_players(directory):
+    """List player packages (folders containing a bot.py) in a directory."""
+    return sorted(p.name for p in Path(directory).iterdir() if (p / "bot.py").is_file())
+
+
+def expand_tournament(players, maps, seeds=(0,), player_dir="src"):
+    """Expand every pairing x map x seed x side into a list of match specs."""
+    matches = []
+    for a, b in itertools.combinations(players, 2):
+        for map_name in maps:
+            for seed in seeds:
+                for p1, p2 in ((a, b), (b, a)):
+                    matches.append({
+                        "p1": p1,
+                        "p2": p2,
+                        "player_dir": player_dir,
+                        "map": map_name,
+                        "seed": seed,
+                    })
+    return matches
+
+
+def hash_player(player_dir):
+    """Hash the source files of a player package, as loaded by CodeContainer.from_directory."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(player_dir).rglob("*.py")):
+        digest.update(path.relative_to(player_dir).as_posix().encode())
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def match_key(match, player_hashes, engine_version):
+    """Content-addressed cache key: the engine version, both players' source, the map, the seed and the sides."""
+    key = f"{engine_version}:{player_hashes[match['p1']]}:{player_hashes[match['p2']]}:{match['map']}:{match['seed']}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def load_cached_result(cache_dir, key):
+    path = Path(cache_dir) / f"{key}.json"
+    if not path.is_file():
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def store_cached_result(cache_dir, key, result):
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    with open(Path(cache_dir) / f"{key}.json", "w") as f:
+        json.dump(result, f)
+
+
+def parse_winner(output):
+    """Find the winning team ('A' or 'B') in the engine output, if reported."""
+    found = re.search(r"\((A|B)\) wins", output)
+    return found.group(1) if found else None
+
+
+def play_match(match, out_dir="matches", instrument=True):
+    """Run a single game in a worker process and report which player won."""
+    from battlecode25 import run_game, RunGameArgs
+
+    game_args = RunGameArgs(
+        player1_dir=Path(match["player_dir"]) / match["p1"],
+        player2_dir=Path(match["player_dir"]) / match["p2"],
+        player1_name=match["p1"],
+        player2_name=match["p2"],
+        map_dir="maps",
+        map_names=match["map"],
+        out_dir=out_dir,
+        out_name=f"{match['p1']}-vs-{match['p2']}-on-{match['map']}-seed{match['seed']}.bc25",
+        show_indicators=False,
+        debug=False,
+        instrument=instrument
+    )
+
+    # Bots import the worker's random module, so seeding it makes the game reproducible
+    random.seed(match["seed"])
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            run_game(game_args)
+    except Exception as e:
+        return {**match, "winner": None, "error": str(e)}
+
+    team = parse_winner(output.getvalue())
+    winner = {"A": match["p1"], "B": match["p2"]}.get(team)
+    return {**match, "winner": winner, "error": None}
+
+
+def run_matches(matches, workers=None, out_dir="matches", instrument=True, cache_dir=None):
+    """
+    Run matches on a process pool, yielding results as games finish.
+    With a cache_dir, games whose players, map and seed were already played on
+    the installed engine version are answered from the cache instead of being
+    replayed.
+    """
+    pending = list(matches)
+    keys = {}
+    if cache_dir is not None:
+        engine_version = get_local_version(ENGINE_VER_DATA)
+        player_hashes = {}
+        for m in matches:
+            for p in (m["p1"], m["p2"]):
+                if p not in player_hashes:
+                    player_hashes[p] = hash_player(Path(m["player_dir"]) / p)
+        pending = []
+        for m in matches:
+            key = match_key(m, player_hashes, engine_version)
+            cached = load_cached_result(cache_dir, key)
+            if cached is not None:
+                yield {**m, "winner": cached["winner"], "error": None, "cached": True}
+            else:
+                keys[id(m)] = key
+                pending.append(m)
+
+    if not pending:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(play_match, m, out_dir, instrument): m for m in pending}
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            if cache_dir is not None and result["winner"] is not None:
+                store_cached_result(cache_dir, keys[id(futures[future])], {"winner": result["winner"]})
+            yield {**result, "cached": False}
+
+
+def print_results_matrix(players, results):
+    """Print a win/loss matrix, row player vs column player, as 'W-L'."""
+    wins = {(p, q): 0 for p in players for q in players}
+    for r in results:
+        if r["winner"] is None:
+            continue
+        loser = r["p2"] if r["winner"] == r["p1"] else r["p1"]
+        wins[(r["winner"], loser)] += 1
+
+    width = max(len(p) for p in players + ["total"]) + 2
+    print("".ljust(width) + "".join(p.rjust(width) for p in players) + "total".rjust(width))
+    for p in players:
+        row = p.ljust(width)
+        total_w = total_l = 0
+        for q in players:
+            if p == q:
+                row += "-".rjust(width)
+                continue
+            w, l = wins[(p, q)], wins[(q, p)]
+            total_w += w
+            total_l += l
+            row += f"{w}-{l}".rjust(width)
+        row += f"{total_w}-{total_l}".rjust(width)
+        print(row)
+
+
+def sprt_llr(wins, losses, p0, p1):
+    """Log-likelihood ratio of a win rate of p1 against p0, given a win/loss record."""
+    return wins * math.log(p1 / p0) + losses * math.log((1 - p1) / (1 - p0))
+
+
+def sprt_decision(wins, losses, margin=0.1, alpha=0.05, beta=0.05):
+    """
+    Three-way sequential probability ratio test on player 1's win rate.
+    Runs one SPRT of 0.5 + margin against 0.5 ("better") and one of 0.5 - margin
+    against 0.5 ("worse"); when both reject, the players are "equal" within margin.
+    Returns "better", "worse", "equal", or None if more games are needed.
+    """
+    lower = math.log(beta / (1 - alpha))
+    upper = math.log((1 - beta) / alpha)
+    better = sprt_llr(wins, losses, 0.5, 0.5 + margin)
+    worse = sprt_llr(wins, losses, 0.5, 0.5 - margin)
+    if better >= upper:
+        return "better"
+    if worse >= upper:
+        return "worse"
+    if better <= lower and worse <= lower:
+        return "equal"
+    return None
+
+
+def check_engine_version(args):
+    """Check the engine is up to date unless skipped. Returns False if outdated."""
+    if not properties["skip_version_check"] and not args.skip_check:
+        ver = check_new_version(ENGINE_VER_DATA)
+        if ver is not None:
+            print(f"!!! New engine version available: {ver}. Run 'python run.py update' to update, or use --skip-check to skip the version check.")
+            return False
+        print("engine is up to date.")
+    else:
+        print("Skipped version check")
+    return True
+
+
 # ====== TASKS =======
 
 
@@ -389,18 +595,86 @@ def task_zip_submission(args):
 
 def task_run(args):
     """Run a match between two players."""
-    if not properties["skip_version_check"] and not args.skip_check:
-        ver = check_new_version(ENGINE_VER_DATA)
-        if ver is not None:
-            print(f"!!! New engine version available: {ver}. Run 'python run.py update' to update, or use --skip-check to skip the version check.")
-            return
-        print("engine is up to date.")
-    else:
-        print("Skipped version check")
+    if not check_engine_version(args):
+        return
 
     run_game(args)
 
 
+def task_tournament(args):
+    """Run every pairing of players on every map, in parallel, and report a win/loss matrix."""
+    if not check_engine_version(args):
+        return
+
+    players = args.players.split(",") if args.players else list_players(args.p1_dir)
+    maps = args.maps.split(",")
+    for player in players:
+        if not verify_package(os.path.join(args.p1_dir, player)):
+            raise RuntimeError(f"Player {player} is not valid!")
+
+    matches = expand_tournament(players, maps, range(args.seeds), args.p1_dir)
+    print(f"Running {len(matches)} games between {', '.join(players)} on {', '.join(maps)}")
+
+    cache_dir = CACHE_DIR if args.cache else None
+    results = []
+    for result in run_matches(matches, args.workers, args.out_file_dir, args.instrument, cache_dir):
+        results.append(result)
+        status = f"winner {result['winner']}" if result["winner"] else f"no winner ({result['error'] or 'unknown'})"
+        if result["cached"]:
+            status += " (cached)"
+        print(f"[{len(results)}/{len(matches)}] {result['p1']} vs {result['p2']} on {result['map']} (seed {result['seed']}): {status}")
+
+    print_results_matrix(players, results)
+
+
+def task_compare(args):
+    """Play --p1 against --p2 across maps and seeds until an SPRT decides which is better."""
+    if not check_engine_version(args):
+        return
+
+    for player in (args.p1, args.p2):
+        if not verify_package(os.path.join(args.p1_dir, player)):
+            raise RuntimeError(f"Player {player} is not valid!")
+
+    maps = args.maps.split(",")
+    schedule = itertools.chain.from_iterable(
+        expand_tournament([args.p1, args.p2], maps, [seed], args.p1_dir) for seed in itertools.count()
+    )
+    cache_dir = CACHE_DIR if args.cache else None
+    batch_size = args.workers or os.cpu_count() or 1
+
+    wins = losses = played = 0
+    decision = None
+    while decision is None and played < args.max_games:
+        # Schedule one pool's worth of games at a time so we stop soon after the test decides
+        batch = list(itertools.islice(schedule, min(batch_size, args.max_games - played)))
+        errors = []
+        for result in run_matches(batch, args.workers, args.out_file_dir, args.instrument, cache_dir):
+            played += 1
+            if result["winner"] == args.p1:
+                wins += 1
+            elif result["winner"] == args.p2:
+                losses += 1
+            else:
+                # Every game has a winner, so no winner means the game failed or its output was not understood
+                errors.append(result)
+        for result in errors:
+            reason = result["error"] or "no winner found in the engine output"
+            print(f"{result['p1']} vs {result['p2']} on {result['map']} (seed {result['seed']}) failed: {reason}")
+        if len(errors) == len(batch):
+            # Every game failing points at the setup (a bad map name, a broken player), not the bots
+            print(f"Aborting: all {len(batch)} games in the last batch failed")
+            return
+        decision = sprt_decision(wins, losses, args.margin, args.alpha, args.beta)
+        print(f"{args.p1} vs {args.p2}: {wins}-{losses} after {played} games")
+
+    if decision is None:
+        print(f"Inconclusive after {played} games: {args.p1} {wins}-{losses} {args.p2}")
+    else:
+        print(f"{args.p1} is {decision} than {args.p2}" if decision != "equal" else
+              f"{args.p1} and {args.p2} are equal within a win rate margin of {args.margin}")
+
+
 # Command-line interface
 if __name__ == "__main__":
     tasks = {
@@ -411,7 +685,9 @@ if __name__ == "__main__":
         "update": task_update,
         "verify": task_verify,
         "zip_submission": task_zip_submission,
-        "run": task_run
+        "run": task_run,
+        "tournament": task_tournament,
+        "compare": task_compare
     }
 
     load_properties()
@@ -464,6 +740,55 @@ if __name__ == "__main__":
         default="DefaultSmall",
         help="Name of the maps to run, separated by commas"
     )
+    parser.add_argument(
+        "--players",
+        type=str,
+        default=None,
+        help="Players for the tournament task, separated by commas. Defaults to every player in --p1-dir"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of games to run in parallel. Defaults to the number of CPU cores"
+    )
+    parser.add_argument(
+        "--seeds",
+        type=int,
+        default=1,
+        help="Number of random seeds to play each pairing and map with. A seed only seeds the "
+             "worker's random module (which the bots use); it is not passed to the engine"
+    )
+    parser.add_argument(
+        "--cache",
+        type=str_to_bool,
+        default=True,
+        help="Reuse results of games whose players, map and seed have already been played on this engine version"
+    )
+    parser.add_argument(
+        "--max-games",
+        type=int,
+        default=400,
+        help="Maximum number of games the compare task plays before giving up"
+    )
+    parser.add_argument(
+        "--margin",
+        type=float,
+        default=0.1,
+        help="Win rate difference from 50%% the compare task tests for"
+    )
+    parser.add_argument(
+        "--alpha",
+        type=float,
+        default=0.05,
+        help="False positive rate of the compare task"
+    )
+    parser.add_argument(
+        "--beta",
+        type=float,
+        default=0.05,
+        help="False negative rate of the compare task"
+    )
     parser.add_argument(
         "--debug",
         type=str_to_bool,
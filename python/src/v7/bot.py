@@ -1,17 +1,23 @@
 import random
 from battlecode25.stubs import *
+from snapshot import Snapshot
+import memory
+import ruins
+import pathing
+import flowfield
+import bugnav
+import tables
+import srp
+import patterns
+import governor
+import symmetry
+import comms
+import hub
+import spawner
+import economy
 
 # Globals
-directions = [
-    Direction.NORTH,
-    Direction.NORTHEAST,
-    Direction.EAST,
-    Direction.SOUTHEAST,
-    Direction.SOUTH,
-    Direction.SOUTHWEST,
-    Direction.WEST,
-    Direction.NORTHWEST,
-]
+directions = tables.DIRECTIONS
 
 SPAWN_LOC = None
 MAP_CENTER = None
@@ -19,9 +25,7 @@ MAP_CENTER = None
 # Key: Robot ID, Value: Direction
 UNIT_DOMINANT_DIR = {}
 
-# V7: Map Memory (from V4)
-MAP_MEMORY = {}
-UNEXPLORED_TARGETS = []
+# V7: Map memory lives in memory.py (flat bytearray of tile flags)
 
 def turn():
     global SPAWN_LOC, MAP_CENTER
@@ -33,65 +37,69 @@ def turn():
             w = get_map_width()
             h = get_map_height()
             MAP_CENTER = MapLocation(w//2, h//2)
-            init_exploration_targets(w, h)
+            memory.init(w, h)
+            ruins.init(w, h)
+            srp.init(w, h)
+            patterns.init(w, h)
+            symmetry.init(w, h)
+            comms.on(comms.RUIN, on_ruin_message)
+            comms.on(comms.EXPLORED, on_explored_message)
+            comms.on(comms.CLAIM, on_claim_message)
         
-        # Update map memory each turn
-        update_map_memory()
+        # Sense once per turn; every stage below reads from this snapshot
+        snap = Snapshot()
+        governor.start_turn(len(snap.enemies) > 0)
+        comms.dispatch(read_messages())
+
+        # Map memory only feeds navigation; in a fight it waits for spare budget
+        governor.run_or_defer('memory', memory.update, snap)
+        governor.run_or_defer('symmetry', symmetry.update)
+        for entry in ruins.update(snap):
+            comms.queue(comms.ruin(entry['loc'], entry['state'], entry['kind'], entry['seen']))
             
         my_type = get_type()
         if my_type == UnitType.SOLDIER:
-            run_soldier()
+            # Only soldiers paint and complete patterns
+            patterns.update(snap)
+            run_soldier(snap)
         elif my_type == UnitType.MOPPER:
-            run_mopper()
+            run_mopper(snap)
         elif my_type == UnitType.SPLASHER:
-            run_splasher()
+            run_splasher(snap)
         elif my_type.is_tower_type():
-            run_tower()
+            run_tower(snap)
+            hub.push(snap)
+
+        # Deferred bookkeeping goes last, within whatever budget is left
+        if memory.NEW_CHUNKS:
+            report_explored()
+        governor.run_or_defer('comms', comms.flush, snap)
+        governor.drain()
     except Exception as e:
         log(f"Error in turn: {e}")
 
-# --- MAP MEMORY HELPERS (from V4) ---
-def init_exploration_targets(w, h):
-    global UNEXPLORED_TARGETS
-    UNEXPLORED_TARGETS = [
-        MapLocation(2, 2), MapLocation(w-3, 2),
-        MapLocation(2, h-3), MapLocation(w-3, h-3),
-        MapLocation(w//2, 2), MapLocation(w//2, h-3),
-        MapLocation(2, h//2), MapLocation(w-3, h//2),
-        MapLocation(w//2, h//2),
-    ]
-
-def update_map_memory():
-    global MAP_MEMORY
-    my_loc = get_location()
-    nearby = sense_nearby_map_infos()
-    for info in nearby:
-        loc = info.get_map_location()
-        key = (loc.x, loc.y)
-        MAP_MEMORY[key] = {
-            'explored': True,
-            'has_ruin': info.has_ruin(),
-            'is_enemy': info.get_paint().is_enemy(),
-        }
-
-def get_unexplored_target(my_loc):
-    global UNEXPLORED_TARGETS
-    unexplored = []
-    for target in UNEXPLORED_TARGETS:
-        key = (target.x, target.y)
-        if key not in MAP_MEMORY or not MAP_MEMORY[key].get('explored', False):
-            unexplored.append(target)
-    if unexplored:
-        unexplored.sort(key=lambda t: my_loc.distance_squared_to(t))
-        return unexplored[0]
-    return None
+def on_ruin_message(loc, data, message):
+    state, kind, seen = comms.ruin_of(data)
+    ruins.report(loc, state, kind, seen)
+
+def on_claim_message(loc, data, message):
+    robot_id, expiry = comms.claim_of(data, message.get_round(), ruins.LEASE)
+    ruins.claim(loc, robot_id, expiry)
+
+def on_explored_message(loc, bits, message):
+    memory.learn_explored(comms.block_of(loc), bits)
+
+def report_explored():
+    """Tell the next tower we pass which chunks we have finished exploring."""
+    blocks = set(c // memory.BLOCK_SIZE for c in memory.NEW_CHUNKS)
+    memory.NEW_CHUNKS.clear()
+    for block in blocks:
+        comms.queue(comms.explored(block, memory.explored_bits(block)))
 
 # --- TOWER ---
-def run_tower():
-    my_location = get_location()
-    
+def run_tower(snap):
     # 1. Attack
-    nearby_enemies = sense_nearby_robots(team=get_team().opponent())
+    nearby_enemies = snap.enemies
     if len(nearby_enemies) > 0:
         target = nearby_enemies[0]
         if can_attack(target.get_location()):
@@ -99,86 +107,48 @@ def run_tower():
             return
 
     # 2. Spawn
-    round_num = get_round_num()
-    money = get_money()
-    
-    # Economy Buffer
-    if round_num < 400:
-        MIN_CHIPS = 0
-    else:
-        MIN_CHIPS = 500
-        
-    if not nearby_enemies and money < MIN_CHIPS:
-        return
+    # Economy: save for a tower pattern underway unless the forecast covers it;
+    # under attack, spend regardless
+    allowed = None if nearby_enemies else economy.can_spend
 
     # V7: "More soldiers at the front in all directions!"
-    # Boosted soldier ratios for maximum expansion pressure
-    
-    if round_num < 500:
-        # MAXIMUM SOLDIER SWARM
-        prob_soldier = 0.90  # Increased from 0.85
-        prob_mopper = 0.03
-        prob_splasher = 0.07
-    elif round_num < 1000:
-        # Heavy Soldier Transition
-        prob_soldier = 0.75  # Increased from 0.65
-        prob_mopper = 0.10
-        prob_splasher = 0.15
-    else:
-        # Late Game (Still Soldier-Heavy)
-        prob_soldier = 0.60  # Increased from 0.50
-        prob_mopper = 0.20
-        prob_splasher = 0.20
-        
-    spawn_dir = directions[random.randint(0, 7)]
-    spawn_loc = my_location.add(spawn_dir)
-    
-    roll = random.random()
-    
-    if roll < prob_soldier:
-        if can_build_robot(UnitType.SOLDIER, spawn_loc):
-            build_robot(UnitType.SOLDIER, spawn_loc)
-            return
-    elif roll < prob_soldier + prob_mopper:
-        if can_build_robot(UnitType.MOPPER, spawn_loc):
-            build_robot(UnitType.MOPPER, spawn_loc)
-            return
-    else:
-        if can_build_robot(UnitType.SPLASHER, spawn_loc):
-            build_robot(UnitType.SPLASHER, spawn_loc)
-            return
+    # Soldier-heavy unit mix per phase, built to quota (spawner.py)
+    choice = spawner.choose(snap, MAP_CENTER, allowed)
+    if choice is not None:
+        unit_type, spawn_loc = choice
+        build(unit_type, spawn_loc)
+        spawner.record(unit_type)
 
-    # Fallback
-    if can_build_robot(UnitType.SOLDIER, spawn_loc):
-         build_robot(UnitType.SOLDIER, spawn_loc)
+def build(unit_type, loc):
+    build_robot(unit_type, loc)
+    # New robots start with what this tower knows
+    hub.welcome(loc)
 
 # --- SOLDIER ---
-def run_soldier():
+def run_soldier(snap):
     """
     V7 Hybrid Behavior:
     - 80% Directional Explorers (Dominant Direction)  
     - 20% Random Explorers (Map Memory + Random Walk)
     """
-    my_loc = get_location()
+    my_loc = snap.my_loc
     my_id = get_id()
     
     # Assign Role: 80% Directional, 20% Random
     is_directional = (my_id % 100) < 80
     
-    # 1. Critical: Complete Structure
-    if try_complete_structure(my_loc): return
-
-    # 2. Paint Project
-    if try_paint_project(my_loc): return
+    # Each stage below uses the action and the move it needs, acting before
+    # or after moving as suits it; whatever cooldown a stage leaves unused is
+    # spent by the ones after it, so the robot both moves and acts each turn.
 
-    # 3. Combat
-    if try_combat(my_loc): return
-    
-    # 4. Mark Tower/SRP
-    if try_mark_structure(my_loc): return
+    # 1-4: stages that keep the robot where it is working; a spare action paints around it
+    if try_complete_structure(my_loc, snap) or try_paint_project(my_loc, snap) \
+            or try_combat(my_loc, snap) or try_mark_structure(my_loc, snap):
+        fill_action(snap)
+        return
     
-    # 5. Aggressive Paint
-    if try_aggressive_paint(my_loc): return
+    # 5. Aggressive Paint before moving on...
+    try_aggressive_paint(my_loc, snap)
     
     # 6. MOVEMENT (Hybrid)
     if is_directional:
@@ -188,13 +158,24 @@ def run_soldier():
         # Random Explorer: Use map memory to find unexplored areas
         smart_explore(my_loc) 
 
+    # ...or after, if nothing was in reach before
+    fill_action(snap)
+
+def fill_action(snap):
+    """Spend an action the turn has not used on painting next to wherever the robot now stands."""
+    if is_action_ready():
+        try_aggressive_paint(get_location(), snap)
+
 def navigate_dominant(my_loc, my_id):
     """
     V7 Refined:
     1. Try Dominant Dir
     2. Try Dominant +/- 45 (Diagonals)
     3. Try Perpendiculars (90 deg)
-    4. If all fail (Dead End), SWITCH Dominant to Opposite.
+    4. If all fail, bug-nav around the obstacle toward the map edge,
+       and keep following the wall until bug-nav lets go of it.
+    SWITCH Dominant to Opposite at the map edge, when the robot goes in
+    circles (every move goes into bug-nav's history) or cannot move at all.
     """
     global UNIT_DOMINANT_DIR
     
@@ -204,90 +185,100 @@ def navigate_dominant(my_loc, my_id):
         UNIT_DOMINANT_DIR[my_id] = d
         
     dom_dir = UNIT_DOMINANT_DIR[my_id]
+    dom_index = tables.DIR_INDEX[dom_dir]
+    edge = edge_target(my_loc, dom_index)
+    if edge is None:
+        # Reached the map edge: bounce back
+        dom_index = reverse_dominant(my_id, dom_index)
+        edge = edge_target(my_loc, dom_index)
+
+    if bugnav.visit(my_loc, bugnav.DIRECTION_KEY + dom_index) >= 2:
+        # Going in circles (a pocket, a dead-end corridor): head the other way
+        dom_index = reverse_dominant(my_id, dom_index)
+        edge = edge_target(my_loc, dom_index)
+        bugnav.visit(my_loc, bugnav.DIRECTION_KEY + dom_index)
     
-    # 1. Try Dominant
-    if can_move(dom_dir):
-        move(dom_dir)
-        return True
-        
-    # 2. Try Diagonals (Left/Right 45) -> "Next in {EW} {NS}" approximation
-    d_left = dom_dir.rotate_left()
-    if can_move(d_left):
-        move(d_left)
-        return True
-        
-    d_right = dom_dir.rotate_right()
-    if can_move(d_right):
-        move(d_right)
-        return True
-        
-    # 3. Try Perpendiculars (Left/Right 90)
-    d_left90 = d_left.rotate_left()
-    if can_move(d_left90):
-        move(d_left90)
-        return True
-        
-    d_right90 = d_right.rotate_right()
-    if can_move(d_right90):
-        move(d_right90)
-        return True
+    # 1-3. Try Dominant, then Diagonals (Left/Right 45), then Perpendiculars (Left/Right 90)
+    if not bugnav.is_following():
+        for d in tables.FAN[dom_index]:
+            if can_move(d):
+                move(d)
+                return True
         
-    # 4. DEAD END / WALL -> Switch Dominant to Opposite
-    new_dom = dom_dir.opposite()
-    UNIT_DOMINANT_DIR[my_id] = new_dom
-    
-    # Try moving to new dominant immediately
-    if can_move(new_dom):
-        move(new_dom)
+    # 4. DEAD END / WALL -> Follow the wall until we can head for the edge again
+    if edge is not None and bugnav.follow(my_loc, edge):
         return True
-        
-    # If even opposite is blocked (Surrounded?), try ANY valid direction
-    for d in directions:
-        if can_move(d):
-            move(d)
-            return True
-            
+    # Boxed in: try the other way next turn
+    reverse_dominant(my_id, dom_index)
     return False
 
+def reverse_dominant(my_id, dom_index):
+    """Switch a unit's dominant direction to the opposite one. Returns its index."""
+    dom_dir = tables.OPPOSITE[dom_index]
+    UNIT_DOMINANT_DIR[my_id] = dom_dir
+    return tables.DIR_INDEX[dom_dir]
+
+def edge_target(my_loc, dir_index):
+    """Last on-map tile of the straight line from my_loc in a direction, or None if my_loc is it."""
+    dx = tables.DIR_DX[dir_index]
+    dy = tables.DIR_DY[dir_index]
+    steps = 1 << 20
+    if dx > 0: steps = min(steps, get_map_width() - 1 - my_loc.x)
+    elif dx < 0: steps = min(steps, my_loc.x)
+    if dy > 0: steps = min(steps, get_map_height() - 1 - my_loc.y)
+    elif dy < 0: steps = min(steps, my_loc.y)
+    if steps <= 0:
+        return None
+    return my_loc.translate(dx * steps, dy * steps)
+
 
 # --- MOPPER ---
-def run_mopper():
-    my_loc = get_location()
-    # Standard logic
-    nearby = sense_nearby_map_infos()
-    random.shuffle(nearby)
-    for tile in nearby:
-        if tile.get_paint().is_enemy() and can_attack(tile.get_map_location()):
-             attack(tile.get_map_location())
-             return
-    
-    best_enemy = None
-    best_dist = 999
-    for tile in nearby:
-        if tile.get_paint().is_enemy():
-            dist = my_loc.distance_squared_to(tile.get_map_location())
-            if dist < best_dist:
-                best_dist = dist
-                best_enemy = tile.get_map_location()
-    
-    if best_enemy:
-        navigate_bounce(best_enemy)
+def run_mopper(snap):
+    # Nearest enemy paint: mop it if in reach, otherwise walk to it
+    enemy_tile = snap.nearest_tile(is_enemy_paint)
+    if enemy_tile:
+        approach_and_attack(enemy_tile.get_map_location())
         return
         
-    for tile in nearby:
-        if tile.get_paint() == PaintType.EMPTY and can_attack(tile.get_map_location()):
-             attack(tile.get_map_location())
-             return
-             
+    empty_tile = snap.nearest_tile(is_attackable_empty, tables.SQUARE3)
+    if empty_tile:
+        attack(empty_tile.get_map_location())
+        return
+
+    # Nothing to clean here: head for where the enemy should be
+    target = enemy_front(snap.my_loc)
+    if target is not None and snap.my_loc.distance_squared_to(target) > tables.VISION_RADIUS_SQ:
+        navigate_to(target)
+        return
     navigate_randomly()
 
+def enemy_front(my_loc):
+    """Nearest predicted enemy tower: the mirror image of our spawn or of a tower we built."""
+    towers = [SPAWN_LOC]
+    for entry in ruins.RUINS.values():
+        if entry['state'] == ruins.ALLY_TOWER:
+            towers.append(entry['loc'])
+    best = None
+    best_dist = 1 << 30
+    for loc in symmetry.enemy_towers(towers):
+        dist = my_loc.distance_squared_to(loc)
+        if dist < best_dist:
+            best_dist = dist
+            best = loc
+    return best
+
+def is_enemy_paint(info):
+    return info.get_paint().is_enemy()
+
+def is_attackable_empty(info):
+    return info.get_paint() == PaintType.EMPTY and can_attack(info.get_map_location())
+
 # --- SPLASHER ---
-def run_splasher():
-    my_loc = get_location()
-    nearby = sense_nearby_map_infos()
+def run_splasher(snap):
+    my_loc = snap.my_loc
     enemy_count = 0
     empty_count = 0
-    for tile in nearby:
+    for tile in snap.map_infos:
         p = tile.get_paint()
         if p.is_enemy(): enemy_count += 1
         elif p == PaintType.EMPTY: empty_count += 1
@@ -300,153 +291,219 @@ def run_splasher():
 
 # --- UTILS ---
 def smart_explore(my_loc):
-    """V7: Use map memory to explore unexplored areas, fallback to random."""
+    """V7: Head for the nearest unexplored chunk of map memory, fallback to random."""
     # 70% try to go to unexplored target, 30% random
     if random.random() < 0.7:
-        target = get_unexplored_target(my_loc)
+        target = memory.frontier_target(my_loc)
         if target:
-            navigate_bounce(target)
+            # Frontier targets move on as chunks get seen: plan a path, no flow field
+            navigate_to(target)
             return
     # Fallback to random
     navigate_randomly()
 
-def navigate_bounce(target_loc):
+def navigate_to(target_loc):
+    """Follow an A* path over map memory; bug-nav while it is still planning."""
+    if not target_loc: return
+    my_loc = get_location()
+    dist = my_loc.distance_squared_to(target_loc)
+    if dist <= 2: return
+    if dist > pathing.SHORT_RANGE_SQ:
+        budget = governor.scaled(pathing.EXPANSIONS_PER_TURN, governor.ASTAR_NODE_COST, pathing.MIN_EXPANSIONS)
+        # Too little budget to plan: bug-nav, unless a finished plan can still answer
+        if budget or pathing.has_plan(target_loc):
+            d = pathing.next_direction(my_loc, target_loc, budget)
+            if d is not None and can_move(d):
+                move(d)
+                return
+            if d is None:
+                # Still planning: keep searching with whatever is left at the end of the turn
+                governor.defer('path', resume_search)
+    bugnav.step(my_loc, target_loc)
+
+def resume_search():
+    pathing.resume(governor.scaled(pathing.EXPANSIONS_PER_TURN, governor.ASTAR_NODE_COST, pathing.MIN_EXPANSIONS))
+
+def navigate_flow(target_loc):
+    """For fixed, often revisited targets: follow a flow field kept across turns."""
     if not target_loc: return
     my_loc = get_location()
     if my_loc.distance_squared_to(target_loc) <= 2: return
-    d = my_loc.direction_to(target_loc)
-    if can_move(d):
+    d = flowfield.direction(my_loc, target_loc, governor.scaled(flowfield.NODES_PER_TURN, governor.FLOW_NODE_COST))
+    if d is not None:
         move(d)
         return
-    dl = d
-    dr = d
-    for _ in range(3):
-        dl = dl.rotate_left()
-        if can_move(dl): move(dl); return
-        dr = dr.rotate_right()
-        if can_move(dr): move(dr); return
-    navigate_randomly()
+    # The field has had this turn's search budget: no A* on top of it
+    bugnav.step(my_loc, target_loc)
 
 def navigate_randomly():
-    choices = list(directions)
-    random.shuffle(choices)
-    for d in choices:
+    for d in tables.random_directions():
         if can_move(d):
             move(d)
             return
 
-def try_complete_structure(my_loc):
-    nearby_map_infos = sense_nearby_map_infos()
-    for info in nearby_map_infos:
-        if info.has_ruin():
-            ruin_loc = info.get_map_location()
-            tower_type = UnitType.LEVEL_ONE_PAINT_TOWER
-            if can_complete_tower_pattern(tower_type, ruin_loc):
-                complete_tower_pattern(tower_type, ruin_loc)
-                log("Completed Tower!")
-                return True
-    
-    if can_complete_resource_pattern(my_loc):
-        complete_resource_pattern(my_loc)
-        return True
-    for d in directions:
-        adj = my_loc.add(d)
-        if can_complete_resource_pattern(adj):
-            complete_resource_pattern(adj)
+def try_complete_structure(my_loc, snap):
+    # Only patterns with every tile painted are worth asking the engine about
+    for entry in patterns.ready(my_loc, 20):
+        loc = entry['loc']
+        if complete_pattern(entry):
             return True
-    return False
-
-def try_paint_project(my_loc):
-    nearby_map_infos = sense_nearby_map_infos()
-    best_project = None
-    best_dist = 999
-    for info in nearby_map_infos:
-        mark = info.get_mark()
-        if mark != PaintType.EMPTY and info.get_paint() != mark:
-            dist = my_loc.distance_squared_to(info.get_map_location())
-            if dist < best_dist:
-                best_dist = dist
-                best_project = info.get_map_location()
-    if best_project:
-        if can_attack(best_project):
-            target_info = sense_map_info(best_project)
-            use_secondary = (target_info.get_mark() == PaintType.ALLY_SECONDARY)
-            attack(best_project, use_secondary)
-            return True
-        else:
-            navigate_bounce(best_project)
+        if my_loc.distance_squared_to(loc) > 2:
+            if not worth_approaching(entry, snap):
+                continue
+            # Walk up and complete it on arrival
+            navigate_to(loc)
+            complete_pattern(entry)
             return True
+        if entry['kind'] == patterns.SRP:
+            # In range, fully painted and still not completable: someone beat us to it
+            srp.set_status(loc.x, loc.y, srp.COMPLETE)
+            patterns.untrack(loc)
     return False
 
-def try_combat(my_loc):
-    nearby_enemies = sense_nearby_robots(team=get_team().opponent())
+def worth_approaching(entry, snap):
+    """
+    Whether to walk up to a painted pattern: not while enemies are in view,
+    and for a tower only once the bank covers it and the ruin has room for us.
+    """
+    if snap.enemies:
+        return False
+    if entry['kind'] == patterns.SRP:
+        return True
+    if get_money() < economy.cost(UnitType.LEVEL_ONE_PAINT_TOWER)[0]:
+        return False
+    ruin = ruins.get(entry['loc'])
+    return ruin is None or not ruins.is_full(ruin, snap, get_id() & comms.CLAIM_ID_MASK, get_round_num())
+
+def complete_pattern(entry):
+    """Complete a fully painted pattern if the engine allows it now. Returns True if it did."""
+    loc = entry['loc']
+    if entry['kind'] == patterns.TOWER:
+        tower_type = UnitType.LEVEL_ONE_PAINT_TOWER
+        if not can_complete_tower_pattern(tower_type, loc):
+            return False
+        complete_tower_pattern(tower_type, loc)
+        ruins.set_state(loc, ruins.ALLY_TOWER, comms.tower_kind(tower_type))
+        log("Completed Tower!")
+    else:
+        if not can_complete_resource_pattern(loc):
+            return False
+        complete_resource_pattern(loc)
+        srp.set_status(loc.x, loc.y, srp.COMPLETE)
+    patterns.untrack(loc)
+    return True
+
+def try_paint_project(my_loc, snap):
+    if not snap.marked: return False
+    project = patterns.nearest_unfinished(my_loc, 20)
+    if project is None:
+        # Marks from a pattern we are not tracking yet (its center is out of view)
+        stray = snap.nearest_tile(needs_paint)
+        if stray is None:
+            return False
+        stray_loc = stray.get_map_location()
+        approach_and_attack(stray_loc, stray.get_mark() == PaintType.ALLY_SECONDARY)
+        return True
+    todo = patterns.todo(project)
+    rank, count = patterns.painters(project, snap, get_id())
+    mine = patterns.share(todo, rank, count) or todo
+    k = patterns.next_tile(project, my_loc, mine, todo)
+    project_loc = patterns.tile_loc(project, k)
+    if approach_and_attack(project_loc, bool((project['secondary'] >> k) & 1)):
+        patterns.painted(project, k)
+    return True
+
+def approach_and_attack(loc, use_secondary=False):
+    """Attack loc now, or step toward it and attack from there. Returns True if the attack happened."""
+    if not can_attack(loc):
+        navigate_to(loc)
+        if not can_attack(loc):
+            return False
+    attack(loc, use_secondary)
+    return True
+
+def needs_paint(info):
+    mark = info.get_mark()
+    return mark != PaintType.EMPTY and info.get_paint() != mark
+
+def try_combat(my_loc, snap):
+    nearby_enemies = snap.enemies
     if nearby_enemies:
-        target = nearby_enemies[0]
-        if can_attack(target.get_location()):
-            attack(target.get_location())
-        dist = my_loc.distance_squared_to(target.get_location())
-        if dist > 2:
-            navigate_bounce(target.get_location())
+        target_loc = nearby_enemies[0].get_location()
+        if can_attack(target_loc):
+            # Act, then close in
+            attack(target_loc)
+            if my_loc.distance_squared_to(target_loc) > 2:
+                navigate_to(target_loc)
+        elif my_loc.distance_squared_to(target_loc) > 2:
+            # Close in, then act
+            approach_and_attack(target_loc)
         return True
     return False
 
-def try_mark_structure(my_loc):
-    nearby_map_infos = sense_nearby_map_infos()
-    best_ruin = None
-    best_dist = 999
-    for info in nearby_map_infos:
-        if info.has_ruin() and info.get_mark() == PaintType.EMPTY:
-            loc = info.get_map_location()
-            rob = sense_robot_at_location(loc)
-            if rob and rob.get_team() == get_team(): continue
-            dist = my_loc.distance_squared_to(loc)
-            if dist < best_dist:
-                best_dist = dist
-                best_ruin = info
+def try_mark_structure(my_loc, snap):
+    # Nearest ruin that still needs a tower and a builder, including ones seen on earlier turns
+    my_id = get_id() & comms.CLAIM_ID_MASK
+    best_ruin = ruins.nearest_open(snap, (ruins.UNCLAIMED, ruins.MARKED, ruins.IN_PROGRESS), my_id)
                 
     if best_ruin:
-        ruin_loc = best_ruin.get_map_location()
+        ruin_loc = best_ruin['loc']
+        renew_claim(best_ruin, my_id)
         if my_loc.distance_squared_to(ruin_loc) <= 2:
+            if best_ruin['state'] != ruins.UNCLAIMED:
+                # Already marked: hold position so the pattern can be completed
+                return True
             tower_type = UnitType.LEVEL_ONE_PAINT_TOWER
             # V7: Maybe prioritize Defense? Keeping simple Paint Tower for now as per V4 success.
             # User didn't specify tower type change.
             if can_mark_tower_pattern(tower_type, ruin_loc):
                 mark_tower_pattern(tower_type, ruin_loc)
+                ruins.set_state(ruin_loc, ruins.MARKED)
                 log("Marked Tower!")
                 return True
         else:
-            navigate_bounce(ruin_loc)
+            navigate_flow(ruin_loc)
+            # Mark on arrival rather than a turn later
+            tower_type = UnitType.LEVEL_ONE_PAINT_TOWER
+            if best_ruin['state'] == ruins.UNCLAIMED and can_mark_tower_pattern(tower_type, ruin_loc):
+                mark_tower_pattern(tower_type, ruin_loc)
+                ruins.set_state(ruin_loc, ruins.MARKED)
+                log("Marked Tower!")
             return True
             
-    # SRP
-    nearby_enemies = sense_nearby_robots(team=get_team().opponent())
-    if not nearby_enemies:
-        for dx in range(-2, 3):
-            for dy in range(-2, 3):
-                loc = my_loc.translate(dx, dy)
-                if can_mark_resource_pattern(loc):
-                    mark_resource_pattern(loc)
-                    return True
+    # SRP: only the lattice points next to us are candidates
+    if not snap.enemies and srp.try_mark(snap):
+        return True
     return False
 
-def try_aggressive_paint(my_loc):
-    nearby_8 = [my_loc.translate(dx, dy) for dx in (-1,0,1) for dy in (-1,0,1)]
-    random.shuffle(nearby_8)
+def renew_claim(entry, my_id):
+    """Take or renew our lease on a ruin, telling the towers when it is new or half used."""
+    round_num = get_round_num()
+    expiry = ruins.claimants(entry, round_num).get(my_id)
+    if expiry is None or expiry - round_num < ruins.LEASE // 2:
+        expiry = round_num + ruins.LEASE
+        ruins.claim(entry['loc'], my_id, expiry)
+        comms.queue(comms.claim(entry['loc'], my_id, expiry))
+
+def try_aggressive_paint(my_loc, snap):
     best_target = None
-    best_priority = -1
-    for loc in nearby_8:
-        if can_attack(loc):
-            try:
-                paint = sense_map_info(loc).get_paint()
-                p = 0
-                if paint.is_enemy(): p = 3
-                elif paint == PaintType.EMPTY: p = 2
-                elif not paint.is_ally(): p = 1
-                if p > best_priority:
-                    best_priority = p
-                    best_target = loc
-            except: pass
-    if best_target and best_priority > 0:
+    best_priority = 0
+    for dx, dy in tables.random_square3():
+        info = snap.tile_xy(my_loc.x + dx, my_loc.y + dy)
+        if info is None: continue
+        # Marked tiles belong to a pattern and are painted to its colours by try_paint_project
+        if info.get_mark() != PaintType.EMPTY: continue
+        paint = info.get_paint()
+        p = 0
+        if paint.is_enemy(): p = 3
+        elif paint == PaintType.EMPTY: p = 2
+        elif not paint.is_ally(): p = 1
+        if p > best_priority:
+            loc = info.get_map_location()
+            if can_attack(loc):
+                best_priority = p
+                best_target = loc
+    if best_target:
         attack(best_target)
         return True
     return False
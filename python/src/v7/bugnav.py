@@ -0,0 +1,97 @@
+from battlecode25.stubs import *
+import tables
+
+# Bug navigation: cheap movement toward a target with no planned path.
+# Head straight for the target; on hitting an obstacle remember the hit
+# distance and follow the wall (keeping it on one hand) until the robot is
+# closer than the hit point and the direct step is free again (leave point).
+# A short ring buffer of visited tiles detects oscillation, which flips the
+# wall-following hand so the next attempt goes around the other way.
+#
+# State is keyed by the target tile, or for callers that head in a direction
+# rather than for a tile (navigate_dominant) by DIRECTION_KEY + direction
+# index; those record their own moves with visit() and call follow() once
+# their own moves are blocked.
+DIRECTION_KEY = 1 << 16
+
+HISTORY_SIZE = 8
+HISTORY = [-1] * HISTORY_SIZE
+HISTORY_POS = 0
+
+TARGET = -1
+FOLLOWING = False
+WALL_DIR = 0     # index into tables.DIRECTIONS
+HIT_DIST = 0
+LEFT_HAND = True
+
+
+def clear_history():
+    global HISTORY_POS
+    for i in range(HISTORY_SIZE):
+        HISTORY[i] = -1
+    HISTORY_POS = 0
+
+
+def remember(tile):
+    """Add tile to the ring buffer and return how often it was already in it."""
+    global HISTORY_POS
+    seen = HISTORY.count(tile)
+    HISTORY[HISTORY_POS] = tile
+    HISTORY_POS = (HISTORY_POS + 1) % HISTORY_SIZE
+    return seen
+
+
+def visit(my_loc, key):
+    """
+    Record my_loc in the history of the navigation keyed key, starting afresh
+    when the key changes. Returns how often my_loc was already in it.
+    """
+    global TARGET, FOLLOWING
+    if key != TARGET:
+        TARGET = key
+        FOLLOWING = False
+        clear_history()
+    return remember(my_loc.y * get_map_width() + my_loc.x)
+
+
+def is_following():
+    return FOLLOWING
+
+
+def step(my_loc, target_loc):
+    """Make one bug-nav move toward target_loc. Returns True if the robot moved."""
+    global FOLLOWING, LEFT_HAND
+    if visit(my_loc, target_loc.y * get_map_width() + target_loc.x) >= 2:
+        # Going in circles: go around the other way from here
+        LEFT_HAND = not LEFT_HAND
+        FOLLOWING = False
+        clear_history()
+    return follow(my_loc, target_loc)
+
+
+def follow(my_loc, target_loc):
+    """Head for target_loc, or keep following the wall hit on the way. Returns True if the robot moved."""
+    global FOLLOWING, WALL_DIR, HIT_DIST
+    dist = my_loc.distance_squared_to(target_loc)
+    direct = my_loc.direction_to(target_loc)
+    if FOLLOWING and dist < HIT_DIST and can_move(direct):
+        FOLLOWING = False
+    if not FOLLOWING:
+        if can_move(direct):
+            move(direct)
+            return True
+        FOLLOWING = True
+        HIT_DIST = dist
+        WALL_DIR = tables.DIR_INDEX[direct]
+
+    turn = -1 if LEFT_HAND else 1
+    i = WALL_DIR
+    for _ in range(8):
+        d = tables.DIRECTIONS[i]
+        if can_move(d):
+            move(d)
+            # Start next turn's scan by facing the wall again
+            WALL_DIR = (i - 2 * turn) % 8
+            return True
+        i = (i + turn) % 8
+    return False
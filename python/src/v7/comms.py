@@ -0,0 +1,173 @@
+from battlecode25.stubs import *
+
+# Message codec. Every message is one int with a record type in the low
+# bits, a map location, and a 16-bit type-specific field, kept under 31 bits
+# so it is a valid signed 32-bit payload:
+#
+#   bits  0-2   type tag (0 is never sent)
+#   bits  3-8   x   (maps are at most 60x60)
+#   bits  9-14  y
+#   bits 15-30  data
+#
+# dispatch() decodes a batch of messages and calls the handler registered
+# for each type with (MapLocation, data, message). read_messages() returns
+# the last few rounds of messages every turn, so rounds already handled are
+# skipped; only the current round is looked at again on the next turn, since
+# robots that move after us may still add to it.
+TAG_BITS = 3
+COORD_BITS = 6
+DATA_BITS = 16
+TAG_MASK = (1 << TAG_BITS) - 1
+COORD_MASK = (1 << COORD_BITS) - 1
+DATA_MASK = (1 << DATA_BITS) - 1
+X_SHIFT = TAG_BITS
+Y_SHIFT = X_SHIFT + COORD_BITS
+DATA_SHIFT = Y_SHIFT + COORD_BITS
+
+RUIN = 1            # data: ruin state (ruins.py), tower kind and the round it was seen in (see ruin())
+ENEMY_TOWER = 2     # data: tower kind (TOWER_*)
+ENEMY_CLUSTER = 3   # data: number of enemies seen there
+CLAIM = 4           # data: claiming robot id (low bits) and lease expiry round (see claim())
+PAINT_REQUEST = 5   # data: paint wanted
+EXPLORED = 6        # location fields hold a chunk block number; data: explored bits (memory.py)
+
+# A ruin record carries the kind of tower on it and the round its state was
+# observed in, so a relayed record never passes for a newer sighting than it
+# is (a game's rounds fit in the 11 bits left)
+STATE_BITS = 3
+KIND_BITS = 2
+STATE_MASK = (1 << STATE_BITS) - 1
+KIND_MASK = (1 << KIND_BITS) - 1
+ROUND_SHIFT = STATE_BITS + KIND_BITS
+ROUND_MASK = DATA_MASK >> ROUND_SHIFT
+
+# A claim's expiry is sent as the round modulo LEASE_WINDOW, so a relayed
+# claim keeps its original expiry; the rest of the field is the robot id
+LEASE_BITS = 6
+LEASE_WINDOW = 1 << LEASE_BITS
+LEASE_MASK = LEASE_WINDOW - 1
+CLAIM_ID_MASK = DATA_MASK >> LEASE_BITS
+
+TOWER_PAINT = 0
+TOWER_MONEY = 1
+TOWER_DEFENSE = 2
+TOWER_UNKNOWN = 3
+
+HANDLERS = [None] * (1 << TAG_BITS)
+
+MAX_OUTBOX = 16
+OUTBOX = []
+
+HANDLED = 0     # messages sent up to this round have been handled
+
+
+def pack(tag, x, y, data=0):
+    return tag | (x << X_SHIFT) | (y << Y_SHIFT) | ((data & DATA_MASK) << DATA_SHIFT)
+
+
+def tag_of(message):
+    return message & TAG_MASK
+
+
+def location_of(message):
+    return MapLocation((message >> X_SHIFT) & COORD_MASK, (message >> Y_SHIFT) & COORD_MASK)
+
+
+def data_of(message):
+    return (message >> DATA_SHIFT) & DATA_MASK
+
+
+def ruin(loc, state, kind, seen):
+    return pack(RUIN, loc.x, loc.y, state | (kind << STATE_BITS) | ((seen & ROUND_MASK) << ROUND_SHIFT))
+
+
+def ruin_of(data):
+    """(state, tower kind, round seen) of a RUIN record."""
+    return data & STATE_MASK, (data >> STATE_BITS) & KIND_MASK, data >> ROUND_SHIFT
+
+
+def enemy_tower(loc, unit_type):
+    return pack(ENEMY_TOWER, loc.x, loc.y, tower_kind(unit_type))
+
+
+def enemy_cluster(loc, count):
+    return pack(ENEMY_CLUSTER, loc.x, loc.y, min(count, DATA_MASK))
+
+
+def claim(loc, robot_id, expiry):
+    return pack(CLAIM, loc.x, loc.y, ((robot_id & CLAIM_ID_MASK) << LEASE_BITS) | (expiry & LEASE_MASK))
+
+
+def claim_of(data, sent, lease):
+    """
+    (robot id, expiry round) of a CLAIM record sent in round sent, for leases
+    of at most lease rounds (less than LEASE_WINDOW).
+    """
+    latest = sent + lease
+    return data >> LEASE_BITS, latest - ((latest - data) & LEASE_MASK)
+
+
+def paint_request(loc, amount):
+    return pack(PAINT_REQUEST, loc.x, loc.y, min(amount, DATA_MASK))
+
+
+def explored(block, bits):
+    return pack(EXPLORED, block & COORD_MASK, block >> COORD_BITS, bits)
+
+
+def block_of(loc):
+    """Chunk block number carried in the location fields of an EXPLORED record."""
+    return (loc.y << COORD_BITS) | loc.x
+
+
+def tower_kind(unit_type):
+    name = unit_type.name
+    if 'PAINT' in name:
+        return TOWER_PAINT
+    if 'MONEY' in name:
+        return TOWER_MONEY
+    if 'DEFENSE' in name:
+        return TOWER_DEFENSE
+    return TOWER_UNKNOWN
+
+
+def on(tag, handler):
+    """Register handler(loc, data, message) for a record type."""
+    HANDLERS[tag] = handler
+
+
+def dispatch(messages):
+    """Handle the messages from rounds not handled yet."""
+    global HANDLED
+    handled = HANDLED
+    for message in messages:
+        if message.get_round() <= handled:
+            continue
+        content = message.get_bytes()
+        handler = HANDLERS[content & TAG_MASK]
+        if handler is not None:
+            handler(location_of(content), data_of(content), message)
+    HANDLED = get_round_num() - 1
+
+
+def queue(content):
+    """Queue a message for the next ally in range; the oldest is dropped when full."""
+    if content in OUTBOX:
+        return
+    if len(OUTBOX) >= MAX_OUTBOX:
+        OUTBOX.pop(0)
+    OUTBOX.append(content)
+
+
+def flush(snap):
+    """Send queued messages to the nearest ally that can receive them, oldest first."""
+    if not OUTBOX:
+        return
+    my_loc = snap.my_loc
+    targets = sorted(snap.allies, key=lambda robot: my_loc.distance_squared_to(robot.get_location()))
+    for robot in targets:
+        loc = robot.get_location()
+        while OUTBOX and can_send_message(loc):
+            send_message(loc, OUTBOX.pop(0))
+        if not OUTBOX:
+            return
@@ -0,0 +1,92 @@
+from battlecode25.stubs import *
+import ruins
+import srp
+import comms
+
+# Economy model for towers. Unit costs come from UnitType (money_cost /
+# paint_cost, the attributes inspect_api.py probes for), with the published
+# values as a fallback. Chip income is modelled from the money towers and
+# completed SRPs this robot knows of (the bank is shared by the whole team,
+# so its changes cannot be put down to any one tower's income), and paint
+# income from this tower's own kind, since each tower keeps its own paint.
+# A tower saves chips toward the next tower only while a tower pattern is
+# underway and the forecast does not cover it in time, and keeps enough paint
+# in sight for a soldier before spending it on anything else; otherwise it
+# spends rather than leaving chips and paint idling.
+FALLBACK_COSTS = {
+    # unit type name -> (chips, paint)
+    'SOLDIER': (250, 200),
+    'MOPPER': (300, 100),
+    'SPLASHER': (400, 300),
+    'LEVEL_ONE_PAINT_TOWER': (1000, 0),
+    'LEVEL_ONE_MONEY_TOWER': (1000, 0),
+    'LEVEL_ONE_DEFENSE_TOWER': (2500, 0),
+}
+CHIPS_PER_MONEY_TOWER = 20  # modelled chips per round per allied money tower
+CHIPS_PER_SRP = 3           # ...and per completed resource pattern
+PAINT_PER_PAINT_TOWER = 5   # modelled paint per round for a paint tower
+
+SAVE_HORIZON = 10       # rounds a marked tower pattern is expected to take to finish
+PATTERN_STALE = 50      # marked ruins not heard of for this long are not saved for
+
+
+def cost(unit_type):
+    """(chips, paint) to build unit_type."""
+    chips, paint = FALLBACK_COSTS.get(unit_type.name, (0, 0))
+    return getattr(unit_type, 'money_cost', chips), getattr(unit_type, 'paint_cost', paint)
+
+
+def tower_count(kind):
+    """Allied towers of one kind (comms.TOWER_*) in the ruin index."""
+    count = 0
+    for entry in ruins.RUINS.values():
+        if entry['state'] == ruins.ALLY_TOWER and entry['kind'] == kind:
+            count += 1
+    return count
+
+
+def srp_count():
+    return srp.STATUS.count(srp.COMPLETE) if srp.STATUS else 0
+
+
+def chip_rate():
+    return CHIPS_PER_MONEY_TOWER * tower_count(comms.TOWER_MONEY) + CHIPS_PER_SRP * srp_count()
+
+
+def paint_rate():
+    """Paint this tower makes per round."""
+    return PAINT_PER_PAINT_TOWER if comms.tower_kind(get_type()) == comms.TOWER_PAINT else 0
+
+
+def forecast_chips(rounds):
+    return get_money() + rounds * chip_rate()
+
+
+def forecast_paint(rounds):
+    return get_paint() + rounds * paint_rate()
+
+
+def tower_reserve():
+    """Chips to keep for a tower pattern that is underway, or 0 if none is."""
+    oldest = get_round_num() - PATTERN_STALE
+    for entry in ruins.RUINS.values():
+        if entry['seen'] >= oldest and (entry['state'] == ruins.MARKED or entry['state'] == ruins.IN_PROGRESS):
+            return cost(UnitType.LEVEL_ONE_PAINT_TOWER)[0]
+    return 0
+
+
+def can_spend(unit_type):
+    """
+    Whether building unit_type now leaves enough, with the income expected
+    over SAVE_HORIZON rounds, to fund a tower pattern that is underway and,
+    if it is not a soldier, this tower's next soldier.
+    """
+    chips, paint = cost(unit_type)
+    if get_money() < chips or get_paint() < paint:
+        return False
+    if unit_type != UnitType.SOLDIER and forecast_paint(SAVE_HORIZON) - paint < cost(UnitType.SOLDIER)[1]:
+        return False
+    reserve = tower_reserve()
+    if reserve == 0:
+        return True
+    return forecast_chips(SAVE_HORIZON) - chips >= reserve
@@ -0,0 +1,144 @@
+from battlecode25.stubs import *
+import memory
+import tables
+
+# Flow fields: a breadth-first distance map toward one fixed target (map
+# center, spawn, exploration targets, known ruins). A field is grown from the
+# target only until it reaches the robot, at most NODES_PER_TURN tiles per
+# call, and picks up where it stopped when the robot later asks from a tile
+# it has not reached yet; a settled tile then answers "best next direction"
+# with 8 lookups, however often the robot switches between goals. Engine
+# globals are per robot, so fields are shared by every navigation call this
+# robot makes rather than across robots.
+#
+# Fields are built over map memory and start over when an obstacle seen since
+# the last call lands on a tile they have already reached (pathing.py does the
+# same for its search tree); obstacles further out are simply not expanded.
+
+NODES_PER_TURN = 25
+MAX_FIELDS = 12
+
+INF = 1 << 20
+
+# target tile index -> {'dist': list, 'queue': list, 'head': int,
+#                       'obstacles': memory.OBSTACLES checked, 'used': round}
+FIELDS = {}
+# Tile index offsets of the eight neighbours, for tiles away from the map edge
+DELTAS = None
+
+
+def new_build(field, target):
+    dist = [INF] * (memory.WIDTH * memory.HEIGHT)
+    dist[target] = 0
+    field['dist'] = dist
+    field['queue'] = [target]
+    field['head'] = 0
+    field['obstacles'] = len(memory.OBSTACLES)
+
+
+def get_field(target):
+    global DELTAS
+    if DELTAS is None:
+        DELTAS = [dy * memory.WIDTH + dx for dx, dy, _ in tables.STEPS]
+    field = FIELDS.get(target)
+    if field is None:
+        if len(FIELDS) >= MAX_FIELDS:
+            # Evict the least recently used field
+            oldest = min(FIELDS, key=lambda k: FIELDS[k]['used'])
+            del FIELDS[oldest]
+        field = {'dist': None, 'queue': None, 'head': 0, 'obstacles': 0, 'used': 0}
+        new_build(field, target)
+        FIELDS[target] = field
+    elif field['obstacles'] != len(memory.OBSTACLES):
+        if invalidated(field):
+            new_build(field, target)
+        else:
+            field['obstacles'] = len(memory.OBSTACLES)
+    field['used'] = get_round_num()
+    return field
+
+
+def invalidated(field):
+    """An obstacle seen since the field last checked sits on a tile it has reached."""
+    dist = field['dist']
+    obstacles = memory.OBSTACLES
+    for k in range(field['obstacles'], len(obstacles)):
+        if dist[obstacles[k]] != INF:
+            return True
+    return False
+
+
+def grow(field, budget, stop):
+    """
+    Advance the field's breadth-first search by up to budget tiles, or until
+    tile stop has a distance (every tile closer to the target is then final).
+    """
+    dist = field['dist']
+    queue = field['queue']
+    head = field['head']
+    w = memory.WIDTH
+    x_max = w - 1
+    y_max = memory.HEIGHT - 1
+    grid = memory.GRID
+    blocked = memory.BLOCKED
+    deltas = DELTAS
+    steps = tables.STEPS
+    n = len(queue)
+    while budget > 0 and head < n and dist[stop] == INF:
+        node = queue[head]
+        head += 1
+        budget -= 1
+        nd = dist[node] + 1
+        x = node % w
+        y = node // w
+        if 0 < x < x_max and 0 < y < y_max:
+            # Interior tile: every neighbour is on the map
+            for d in deltas:
+                nb = node + d
+                if dist[nb] == INF and not grid[nb] & blocked:
+                    dist[nb] = nd
+                    queue.append(nb)
+                    n += 1
+            continue
+        for dx, dy, _ in steps:
+            nx = x + dx
+            ny = y + dy
+            if nx < 0 or ny < 0 or nx > x_max or ny > y_max:
+                continue
+            nb = ny * w + nx
+            if dist[nb] == INF and not grid[nb] & blocked:
+                dist[nb] = nd
+                queue.append(nb)
+                n += 1
+    field['head'] = head
+
+
+def direction(my_loc, target_loc, budget=NODES_PER_TURN):
+    """
+    Movable direction that gets closest to target_loc according to its flow
+    field, or None while the field has not reached my_loc yet or no
+    neighbour helps.
+    """
+    w = memory.WIDTH
+    field = get_field(target_loc.y * w + target_loc.x)
+    x = my_loc.x
+    y = my_loc.y
+    me = y * w + x
+    dist = field['dist']
+    if dist[me] == INF:
+        grow(field, budget, me)
+        if dist[me] == INF:
+            return None
+    h_max = memory.HEIGHT
+    best = None
+    best_dist = dist[me]
+    for dx, dy, d in tables.STEPS:
+        nx = x + dx
+        ny = y + dy
+        if nx < 0 or ny < 0 or nx >= w or ny >= h_max:
+            continue
+        nd = dist[ny * w + nx]
+        if nd < best_dist and can_move(d):
+            best_dist = nd
+            best = d
+    return best
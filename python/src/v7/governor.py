@@ -0,0 +1,97 @@
+from battlecode25.stubs import *
+
+# Per-turn budget governor. The try_* decision stages run first; bookkeeping
+# that can wait (map memory ingest, path search, message encoding) is queued
+# under a name and drained at the end of the turn while enough bytecode is
+# left, so a busy turn never runs past the limit and loses the robot's
+# actions. Queueing a name that is already waiting replaces its arguments,
+# so a stale snapshot is never ingested after a newer one.
+#
+# Not every engine build exposes the bytecode counter; without it a turn
+# with enemies in view counts as busy and defers everything, a quiet turn
+# drains the whole queue, and search work is held to a fixed share of an
+# assumed per-turn limit.
+
+RESERVE = 1500              # bytecodes kept back for the end of the turn
+TURN_LIMIT = 15000          # per-turn limit assumed when the engine does not report what is left
+# Measured cost of one search node, in opcodes: an A* expansion with its heap
+# work, and one flow field tile (pathing.py, flowfield.py)
+ASTAR_NODE_COST = 1400
+FLOW_NODE_COST = 210
+# Without the counter, search work per turn is capped at these
+SEARCH_BUDGET = TURN_LIMIT // 3
+BUSY_SEARCH_BUDGET = TURN_LIMIT // 10
+
+try:
+    BYTECODES_LEFT = get_bytecodes_left
+except NameError:
+    BYTECODES_LEFT = None
+
+QUEUE = {}      # name -> (fn, args), oldest first
+BUSY = False
+SEARCH_LEFT = 0
+
+
+def start_turn(busy):
+    """Record whether this turn is busy (enemies in view) before any stage runs."""
+    global BUSY, SEARCH_LEFT
+    BUSY = busy
+    SEARCH_LEFT = BUSY_SEARCH_BUDGET if busy else SEARCH_BUDGET
+
+
+def bytecodes_left():
+    """Bytecodes left this turn, or None if the engine does not say."""
+    if BYTECODES_LEFT is None:
+        return None
+    return BYTECODES_LEFT()
+
+
+def has_budget(cost=0):
+    left = bytecodes_left()
+    if left is None:
+        return not BUSY
+    return left - cost > RESERVE
+
+
+def scaled(amount, unit_cost, minimum=1):
+    """
+    Cap a per-turn work amount (search nodes costing unit_cost each) to what
+    the remaining budget allows, or 0 if fewer than minimum nodes fit (the
+    work is not worth starting then). Without the counter, every call in a
+    turn draws on the same fixed search budget.
+    """
+    global SEARCH_LEFT
+    left = bytecodes_left()
+    if left is None:
+        fit = SEARCH_LEFT // unit_cost
+        if fit > amount:
+            fit = amount
+        if fit < minimum:
+            return 0
+        SEARCH_LEFT -= fit * unit_cost
+        return fit
+    fit = (left - RESERVE) // unit_cost
+    if fit < minimum:
+        return 0
+    return fit if fit < amount else amount
+
+
+def defer(name, fn, *args):
+    QUEUE[name] = (fn, args)
+
+
+def run_or_defer(name, fn, *args):
+    """Run fn now on a quiet turn, otherwise queue it for when there is budget."""
+    if not BUSY and has_budget():
+        QUEUE.pop(name, None)
+        fn(*args)
+    else:
+        defer(name, fn, *args)
+
+
+def drain():
+    """Run queued work, oldest first, until the queue is empty or the budget runs low."""
+    while QUEUE and has_budget():
+        name = next(iter(QUEUE))
+        fn, args = QUEUE.pop(name)
+        fn(*args)
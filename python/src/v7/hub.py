@@ -0,0 +1,69 @@
+from battlecode25.stubs import *
+import memory
+import ruins
+import comms
+
+# Towers as team knowledge hubs. Robots report ruin sightings and explored
+# chunks to towers they pass (comms.flush); a tower folds those into its own
+# ruin index and chunk grid like any other robot. On top of that it pushes
+# a summary of what it knows to each robot it builds, and to robots in range
+# that have not had one for PUSH_INTERVAL rounds, so new robots start with
+# the team's map instead of scanning for it.
+PUSH_INTERVAL = 50
+MAX_SUMMARY = 20
+
+PUSHED = {}     # robot id -> round of its last complete summary
+
+
+def summary():
+    """Ruins first (most recently seen first) with their builders' claims, then explored chunk blocks."""
+    round_num = get_round_num()
+    entries = sorted(ruins.RUINS.values(), key=lambda entry: -entry['seen'])
+    messages = []
+    for entry in entries:
+        messages.append(comms.ruin(entry['loc'], entry['state'], entry['kind'], entry['seen']))
+        for robot_id, expiry in ruins.claimants(entry, round_num).items():
+            messages.append(comms.claim(entry['loc'], robot_id, expiry))
+    for block in range(memory.block_count()):
+        if len(messages) >= MAX_SUMMARY:
+            break
+        bits = memory.explored_bits(block)
+        if bits:
+            messages.append(comms.explored(block, bits))
+    return messages[:MAX_SUMMARY]
+
+
+def send_summary(robot_id, loc, messages):
+    """Send as much of the summary as the tower's message allowance permits. Returns True if all of it went."""
+    for content in messages:
+        if not can_send_message(loc):
+            return False
+        send_message(loc, content)
+    PUSHED[robot_id] = get_round_num()
+    return True
+
+
+def welcome(loc):
+    """Give a robot this tower just built the summary right away."""
+    robot = sense_robot_at_location(loc)
+    if robot is not None:
+        send_summary(robot.get_id(), loc, summary())
+
+
+def push(snap):
+    """Refresh robots in range whose last summary is PUSH_INTERVAL rounds old."""
+    round_num = get_round_num()
+    messages = None
+    for robot in snap.allies:
+        if robot.get_type().is_tower_type():
+            continue
+        robot_id = robot.get_id()
+        last = PUSHED.get(robot_id)
+        if last is not None and round_num - last < PUSH_INTERVAL:
+            continue
+        if messages is None:
+            messages = summary()
+            if not messages:
+                return
+        if not send_summary(robot_id, robot.get_location(), messages):
+            return
@@ -0,0 +1,191 @@
+from battlecode25.stubs import *
+import tables
+
+# Map memory: one byte of flags per tile, stored row-major at y * WIDTH + x.
+# Allocated once in init(), so it costs the same for the whole game. Readers
+# (pathing, flowfield, srp, symmetry) test GRID bits directly in their loops.
+EXPLORED = 1
+RUIN = 2
+BLOCKED = 4     # wall or ruin: never passable
+
+# Tile indices found to be blocked this turn that were unknown before, so
+# cached paths crossing them can be invalidated, and all of them in the order
+# found, for consumers that do not look every turn
+NEW_OBSTACLES = []
+OBSTACLES = []
+# Tile indices recorded for the first time, until a consumer (symmetry.py) clears them
+NEW_TILES = []
+
+WIDTH = 0
+HEIGHT = 0
+GRID = None
+
+# Coarse grid of CHUNK x CHUNK tile cells counting the tiles in each that
+# have never been seen, kept up to date as tiles are first recorded, so the
+# exploration frontier is one pass over the chunks instead of the tiles.
+CHUNK = 4
+CHUNK_SHIFT = 2
+FRONTIER_MIN = 4    # chunks with fewer unseen tiles are only picked as a last resort
+CHUNK_COLS = 0
+CHUNK_ROWS = 0
+UNSEEN = None       # bytearray, unseen tile count per chunk
+CHUNK_CENTERS = []  # MapLocation per chunk
+TEAM_SEEN = None    # bytearray, 1 for chunks a teammate reported explored
+# Chunks this robot just finished exploring, until they are reported
+NEW_CHUNKS = []
+# Chunks are reported in blocks of BLOCK_SIZE, one bit each
+BLOCK_SIZE = 16
+
+# Vision offsets, and for each single step (dx, dy) the offsets (relative to the
+# new location) that were outside the vision circle before the step.
+VISION_RADIUS_SQ = tables.VISION_RADIUS_SQ
+VISION_OFFSETS = tables.VISION_OFFSETS
+# VISION_DELTA[(dy + 1) * 3 + dx + 1]
+VISION_DELTA = [
+    [(ox, oy) for ox, oy in VISION_OFFSETS if (ox + dx) ** 2 + (oy + dy) ** 2 > VISION_RADIUS_SQ]
+    for dy in (-1, 0, 1) for dx in (-1, 0, 1)
+]
+PREV_X = None
+PREV_Y = None
+
+
+def init(w, h):
+    global WIDTH, HEIGHT, GRID, CHUNK_COLS, CHUNK_ROWS, UNSEEN, CHUNK_CENTERS, TEAM_SEEN
+    WIDTH = w
+    HEIGHT = h
+    GRID = bytearray(w * h)
+    CHUNK_COLS = (w + CHUNK - 1) >> CHUNK_SHIFT
+    CHUNK_ROWS = (h + CHUNK - 1) >> CHUNK_SHIFT
+    UNSEEN = bytearray(CHUNK_COLS * CHUNK_ROWS)
+    TEAM_SEEN = bytearray(CHUNK_COLS * CHUNK_ROWS)
+    CHUNK_CENTERS = []
+    for cy in range(CHUNK_ROWS):
+        y0 = cy * CHUNK
+        y1 = min(h, y0 + CHUNK)
+        for cx in range(CHUNK_COLS):
+            x0 = cx * CHUNK
+            x1 = min(w, x0 + CHUNK)
+            UNSEEN[cy * CHUNK_COLS + cx] = (x1 - x0) * (y1 - y0)
+            CHUNK_CENTERS.append(MapLocation((x0 + x1 - 1) // 2, (y0 + y1 - 1) // 2))
+
+
+def update(snap):
+    """
+    Record the tiles in this turn's snapshot that memory does not know yet.
+    After a one-tile step only the tiles that entered vision are ingested,
+    and standing still ingests nothing (walls and ruins never change).
+    Anything else (first turn, being displaced) falls back to a full ingest.
+    """
+    global PREV_X, PREV_Y
+    NEW_OBSTACLES.clear()
+    x = snap.my_loc.x
+    y = snap.my_loc.y
+    if PREV_X is None:
+        dx = dy = 2
+    else:
+        dx = x - PREV_X
+        dy = y - PREV_Y
+    PREV_X = x
+    PREV_Y = y
+
+    if dx == 0 and dy == 0:
+        return
+    if -1 <= dx <= 1 and -1 <= dy <= 1:
+        ingest_offsets(snap, VISION_DELTA[(dy + 1) * 3 + dx + 1])
+    else:
+        ingest_all(snap)
+    OBSTACLES.extend(NEW_OBSTACLES)
+
+
+def record(info, grid, w):
+    loc = info.get_map_location()
+    i = loc.y * w + loc.x
+    if grid[i] == 0:
+        c = (loc.y >> CHUNK_SHIFT) * CHUNK_COLS + (loc.x >> CHUNK_SHIFT)
+        UNSEEN[c] -= 1
+        if UNSEEN[c] == FRONTIER_MIN - 1:
+            NEW_CHUNKS.append(c)
+        NEW_TILES.append(i)
+    flags = EXPLORED
+    if info.has_ruin():
+        flags |= RUIN
+    if not info.is_passable():
+        flags |= BLOCKED
+        if grid[i] & BLOCKED == 0:
+            NEW_OBSTACLES.append(i)
+    grid[i] = flags
+
+
+def ingest_all(snap):
+    grid = GRID
+    w = WIDTH
+    for info in snap.map_infos:
+        record(info, grid, w)
+
+
+def ingest_offsets(snap, offsets):
+    grid = GRID
+    w = WIDTH
+    tiles = snap.tiles
+    x = snap.my_loc.x
+    y = snap.my_loc.y
+    for ox, oy in offsets:
+        tx = x + ox
+        if tx < 0 or tx >= w:
+            continue
+        info = tiles.get((y + oy) * w + tx)
+        if info is not None:
+            record(info, grid, w)
+
+
+def frontier_target(my_loc):
+    """
+    Center of the nearest chunk with at least FRONTIER_MIN unseen tiles, else
+    of the nearest chunk with any, or None once the whole map has been seen.
+    """
+    best = -1
+    best_dist = 1 << 30
+    fallback = -1
+    fallback_dist = 1 << 30
+    centers = CHUNK_CENTERS
+    unseen = UNSEEN
+    team_seen = TEAM_SEEN
+    for i in range(len(unseen)):
+        n = unseen[i]
+        if n == 0 or team_seen[i]:
+            continue
+        dist = my_loc.distance_squared_to(centers[i])
+        if n >= FRONTIER_MIN:
+            if dist < best_dist:
+                best_dist = dist
+                best = i
+        elif dist < fallback_dist:
+            fallback_dist = dist
+            fallback = i
+    if best < 0:
+        best = fallback
+    return centers[best] if best >= 0 else None
+
+
+def block_count():
+    return (len(UNSEEN) + BLOCK_SIZE - 1) // BLOCK_SIZE
+
+
+def explored_bits(block):
+    """One bit per chunk of the block that this robot or a teammate has explored."""
+    bits = 0
+    base = block * BLOCK_SIZE
+    end = min(base + BLOCK_SIZE, len(UNSEEN))
+    for c in range(base, end):
+        if UNSEEN[c] < FRONTIER_MIN or TEAM_SEEN[c]:
+            bits |= 1 << (c - base)
+    return bits
+
+
+def learn_explored(block, bits):
+    """Take a teammate's explored chunks, so the frontier skips them."""
+    base = block * BLOCK_SIZE
+    end = min(base + BLOCK_SIZE, len(UNSEEN))
+    for c in range(base, end):
+        if bits >> (c - base) & 1:
+            TEAM_SEEN[c] = 1
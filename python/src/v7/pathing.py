@@ -0,0 +1,212 @@
+from battlecode25.stubs import *
+import memory
+import tables
+
+# Incremental A* over the remembered map (memory.py). Unknown tiles are
+# assumed passable. The search runs backwards from the target, so once the
+# robot's tile is reached every expanded tile knows its next hop toward the
+# target (PARENT), and the result stays usable after the robot drifts a bit.
+# A search that runs out of its per-turn expansion budget is suspended and
+# resumed on the next call; a finished one is reused until a newly seen
+# obstacle lands on the path or the target changes.
+
+EXPANSIONS_PER_TURN = 100
+MAX_EXPANSIONS = 2500   # give up on targets that are walled off
+MIN_EXPANSIONS = 10     # a turn that fits fewer bug-navs instead of planning a few nodes
+SHORT_RANGE_SQ = 8      # closer than this, plain greedy movement is enough
+
+INF = 1 << 20
+NODE_BITS = 12          # tile indices fit in 12 bits (maps are at most 60x60)
+NODE_MASK = (1 << NODE_BITS) - 1
+
+TARGET = -1
+GOAL = -1
+OPEN = []       # binary heap of ints: (f << 2 * NODE_BITS) | (h << NODE_BITS) | node
+G = None
+PARENT = None
+EXPANDED = 0
+DONE = False
+FAILED = False
+PATH = set()
+
+
+# --- Binary heap on plain ints (cheaper than tuples) ---
+def heap_push(heap, item):
+    heap.append(item)
+    i = len(heap) - 1
+    while i > 0:
+        p = (i - 1) >> 1
+        if heap[p] <= item:
+            break
+        heap[i] = heap[p]
+        i = p
+    heap[i] = item
+
+
+def heap_pop(heap):
+    last = heap.pop()
+    if not heap:
+        return last
+    top = heap[0]
+    n = len(heap)
+    i = 0
+    while True:
+        c = 2 * i + 1
+        if c >= n:
+            break
+        if c + 1 < n and heap[c + 1] < heap[c]:
+            c += 1
+        if heap[c] >= last:
+            break
+        heap[i] = heap[c]
+        i = c
+    heap[i] = last
+    return top
+
+
+def heuristic(node, goal, w):
+    dx = node % w - goal % w
+    dy = node // w - goal // w
+    if dx < 0:
+        dx = -dx
+    if dy < 0:
+        dy = -dy
+    return dx if dx > dy else dy
+
+
+def start_search(target, goal):
+    global TARGET, GOAL, OPEN, G, PARENT, EXPANDED, DONE, FAILED, PATH
+    n = memory.WIDTH * memory.HEIGHT
+    TARGET = target
+    GOAL = goal
+    G = [INF] * n
+    PARENT = [-1] * n
+    G[target] = 0
+    h = heuristic(target, goal, memory.WIDTH)
+    OPEN = [(h << 2 * NODE_BITS) | (h << NODE_BITS) | target]
+    EXPANDED = 0
+    DONE = False
+    FAILED = False
+    PATH = set()
+
+
+def search(budget):
+    """Expand up to budget nodes. Returns True once the goal has been reached."""
+    global EXPANDED, DONE, FAILED
+    if DONE or FAILED:
+        return DONE
+    w = memory.WIDTH
+    h_max = memory.HEIGHT
+    grid = memory.GRID
+    blocked = memory.BLOCKED
+    g = G
+    parent = PARENT
+    heap = OPEN
+    goal = GOAL
+    gx = goal % w
+    gy = goal // w
+    while budget > 0:
+        if not heap:
+            FAILED = True
+            return False
+        item = heap_pop(heap)
+        node = item & NODE_MASK
+        node_g = g[node]
+        # Skip stale heap entries left behind by a later, cheaper relaxation
+        if (item >> 2 * NODE_BITS) != node_g + ((item >> NODE_BITS) & NODE_MASK):
+            continue
+        if node == goal:
+            DONE = True
+            trace_path()
+            return True
+        budget -= 1
+        EXPANDED += 1
+        if EXPANDED > MAX_EXPANSIONS:
+            FAILED = True
+            return False
+        x = node % w
+        y = node // w
+        ng = node_g + 1
+        for dx, dy, _ in tables.STEPS:
+            nx = x + dx
+            ny = y + dy
+            if nx < 0 or ny < 0 or nx >= w or ny >= h_max:
+                continue
+            nb = ny * w + nx
+            if grid[nb] & blocked:
+                continue
+            if ng < g[nb]:
+                g[nb] = ng
+                parent[nb] = node
+                hx = nx - gx
+                hy = ny - gy
+                if hx < 0:
+                    hx = -hx
+                if hy < 0:
+                    hy = -hy
+                h = hx if hx > hy else hy
+                heap_push(heap, ((ng + h) << 2 * NODE_BITS) | (h << NODE_BITS) | nb)
+    return False
+
+
+def has_plan(target_loc):
+    """Whether a finished search toward target_loc can answer without expanding anything."""
+    return TARGET == target_loc.y * memory.WIDTH + target_loc.x and (DONE or FAILED)
+
+
+def resume(budget=EXPANSIONS_PER_TURN):
+    """Advance a suspended search without asking for a direction (spare budget)."""
+    if TARGET != -1 and not DONE and not FAILED:
+        search(budget)
+
+
+def trace_path():
+    node = GOAL
+    while node != -1:
+        PATH.add(node)
+        node = PARENT[node]
+
+
+def invalidated():
+    """A newly seen obstacle sits on the found path, or inside the search tree so far."""
+    for i in memory.NEW_OBSTACLES:
+        if DONE:
+            if i in PATH:
+                return True
+        elif G[i] != INF:
+            return True
+    return False
+
+
+def next_direction(my_loc, target_loc, budget=EXPANSIONS_PER_TURN):
+    """
+    Direction of the next step toward target_loc along a planned path, or None
+    if the plan is not ready yet (the search is suspended until the next call)
+    or the target cannot be reached through the known map.
+    """
+    global GOAL
+    w = memory.WIDTH
+    me = my_loc.y * w + my_loc.x
+    target = target_loc.y * w + target_loc.x
+    if target != TARGET or invalidated():
+        start_search(target, me)
+    elif DONE and G[me] == INF:
+        # Pushed off the search tree: plan again from here
+        start_search(target, me)
+    elif not DONE and not FAILED:
+        # The robot may have moved while the search was suspended
+        GOAL = me
+    if not DONE and not FAILED:
+        search(budget)
+    # Mid-search parents are not final yet; a failed search still leaves a
+    # usable tree for any tile it reached
+    if not DONE and not FAILED or G[me] == INF:
+        return None
+    nxt = PARENT[me]
+    if nxt == -1:
+        return None
+    if memory.GRID[nxt] & memory.BLOCKED and nxt != TARGET:
+        # An obstacle seen on a turn we did not navigate: replan next call
+        start_search(target, me)
+        return None
+    return tables.STEP_DIR[(nxt // w - my_loc.y + 1) * 3 + nxt % w - my_loc.x + 1]
@@ -0,0 +1,226 @@
+from battlecode25.stubs import *
+import tables
+import ruins
+import srp
+
+# Marked-but-incomplete patterns (tower patterns around ruins and resource
+# patterns on the SRP lattice) with how many of their tiles still need paint.
+# The count is refreshed from the snapshot whenever a pattern is in view, and
+# can_complete_* is only called once it reaches zero, instead of probing
+# every nearby ruin and tile each turn.
+#
+# Pattern state is kept as 25-bit masks over the 5x5 footprint (bit k is
+# tables.PATTERN_OFFSETS[k]): which tiles' marks have been seen, which of
+# those want secondary paint, and which are painted to their mark. The
+# tiles left to paint and the next one to paint are a few integer
+# operations on these, and the masks carry over between turns.
+# Keyed by y * WIDTH + x -> {'loc': MapLocation, 'kind': int, 'mask': int, 'known': int,
+#                            'secondary': int, 'done': int, 'remaining': int, 'seen': round}
+TOWER = 0
+SRP = 1
+
+# Soldiers around the same pattern split its tiles: painters are ranked by
+# id and each prefers every n-th tile still to paint, so they do not race
+# for the same tile. A painter with nothing of its share in reach still
+# paints whatever it can reach rather than waste the action.
+PAINTER_RANGE_SQ = 8    # allied soldiers this close to the center count as painters
+MIN_PAINT = 5           # ...if they have the paint for at least one tile
+
+WIDTH = 0
+HEIGHT = 0
+PATTERNS = {}
+
+
+def init(w, h):
+    global WIDTH, HEIGHT
+    WIDTH = w
+    HEIGHT = h
+
+
+def track(loc, kind):
+    key = loc.y * WIDTH + loc.x
+    if key not in PATTERNS:
+        mask = tables.TOWER_MASK if kind == TOWER else tables.SRP_MASK
+        for k, (dx, dy) in enumerate(tables.PATTERN_OFFSETS):
+            x = loc.x + dx
+            y = loc.y + dy
+            if x < 0 or y < 0 or x >= WIDTH or y >= HEIGHT:
+                mask &= ~(1 << k)
+        PATTERNS[key] = {'loc': loc, 'kind': kind, 'mask': mask, 'known': 0,
+                         'secondary': 0, 'done': 0, 'remaining': mask.bit_count(), 'seen': 0}
+
+
+def untrack(loc):
+    PATTERNS.pop(loc.y * WIDTH + loc.x, None)
+
+
+def refresh(snap, entry):
+    """Update the pattern's masks from the tiles of it in view."""
+    loc = entry['loc']
+    x = loc.x
+    y = loc.y
+    known = entry['known']
+    secondary = entry['secondary']
+    done = entry['done']
+    bit = 1
+    for dx, dy in tables.PATTERN_OFFSETS:
+        info = snap.tile_xy(x + dx, y + dy)
+        if info is not None:
+            mark = info.get_mark()
+            if mark == PaintType.EMPTY:
+                known &= ~bit
+                done &= ~bit
+            else:
+                known |= bit
+                if mark == PaintType.ALLY_SECONDARY:
+                    secondary |= bit
+                else:
+                    secondary &= ~bit
+                if info.get_paint() == mark:
+                    done |= bit
+                else:
+                    done &= ~bit
+        bit <<= 1
+    entry['known'] = known
+    entry['secondary'] = secondary
+    entry['done'] = done
+    entry['remaining'] = (entry['mask'] & ~done).bit_count()
+
+
+def update(snap):
+    """Pick up newly marked patterns in view and refresh their unpainted counts."""
+    my_loc = snap.my_loc
+    vision = tables.VISION_RADIUS_SQ
+    for entry in ruins.within(my_loc, (ruins.MARKED, ruins.IN_PROGRESS), vision):
+        track(entry['loc'], TOWER)
+    for x, y, i in srp.nearby(my_loc, 4):
+        status = srp.STATUS[i]
+        if status == srp.MARKED or status == srp.OPEN:
+            info = snap.tile_xy(x, y)
+            if info is None:
+                continue
+            if status == srp.OPEN:
+                # A teammate may have marked it since we last looked
+                if info.get_mark() == PaintType.EMPTY or srp.obstructed(x, y):
+                    continue
+                srp.STATUS[i] = srp.MARKED
+            track(info.get_map_location(), SRP)
+
+    if not PATTERNS:
+        return
+    round_num = get_round_num()
+    for key in list(PATTERNS):
+        entry = PATTERNS[key]
+        loc = entry['loc']
+        if my_loc.distance_squared_to(loc) > vision:
+            continue
+        if entry['kind'] == TOWER:
+            ruin = ruins.RUINS.get(key)
+            if ruin is not None and ruin['state'] >= ruins.ALLY_TOWER:
+                del PATTERNS[key]
+                continue
+        elif srp.STATUS[srp.cell(loc.x, loc.y)] != srp.MARKED:
+            del PATTERNS[key]
+            continue
+        refresh(snap, entry)
+        entry['seen'] = round_num
+
+
+def ready(my_loc, max_dist_sq):
+    """Tracked patterns with nothing left to paint within max_dist_sq, nearest first."""
+    found = [entry for entry in PATTERNS.values()
+             if entry['remaining'] == 0 and my_loc.distance_squared_to(entry['loc']) <= max_dist_sq]
+    found.sort(key=lambda entry: my_loc.distance_squared_to(entry['loc']))
+    return found
+
+
+def nearest_unfinished(my_loc, max_dist_sq):
+    """Closest tracked pattern with a seen tile that still needs paint, or None."""
+    best = None
+    best_dist = max_dist_sq + 1
+    for entry in PATTERNS.values():
+        if todo(entry):
+            dist = my_loc.distance_squared_to(entry['loc'])
+            if dist < best_dist:
+                best_dist = dist
+                best = entry
+    return best
+
+
+def todo(entry):
+    """Bits of seen pattern tiles not painted to their mark."""
+    return entry['mask'] & entry['known'] & ~entry['done']
+
+
+def painters(entry, snap, my_id):
+    """(rank, count): this robot's place by id among the soldiers painting the pattern, and their number."""
+    loc = entry['loc']
+    rank = 0
+    count = 1
+    for robot in snap.allies:
+        if robot.get_type() != UnitType.SOLDIER or robot.get_paint_amount() < MIN_PAINT:
+            continue
+        if robot.get_location().distance_squared_to(loc) > PAINTER_RANGE_SQ:
+            continue
+        count += 1
+        if robot.get_id() < my_id:
+            rank += 1
+    return rank, count
+
+
+def share(bits, rank, count):
+    """Every count-th set bit of bits, starting at the rank-th."""
+    if count == 1:
+        return bits
+    mine = 0
+    i = 0
+    while bits:
+        low = bits & -bits
+        if i % count == rank:
+            mine |= low
+        bits ^= low
+        i += 1
+    return mine
+
+
+def next_tile(entry, my_loc, mine, todo):
+    """
+    Bit of the pattern tile to work on next: one of our share (mine) within
+    paint reach, else any tile still to do within reach, else the nearest of
+    our share to walk to.
+    """
+    loc = entry['loc']
+    rx = my_loc.x - loc.x
+    ry = my_loc.y - loc.y
+    if -6 <= rx <= 6 and -6 <= ry <= 6:
+        reach = tables.PAINT_REACH[(ry + 6) * 13 + rx + 6]
+        reachable = mine & reach or todo & reach
+        if reachable:
+            return (reachable & -reachable).bit_length() - 1
+    best = -1
+    best_dist = 1 << 30
+    offsets = tables.PATTERN_OFFSETS
+    bits = mine
+    while bits:
+        k = (bits & -bits).bit_length() - 1
+        bits &= bits - 1
+        dx, dy = offsets[k]
+        dist = (dx - rx) * (dx - rx) + (dy - ry) * (dy - ry)
+        if dist < best_dist:
+            best_dist = dist
+            best = k
+    return best
+
+
+def tile_loc(entry, k):
+    dx, dy = tables.PATTERN_OFFSETS[k]
+    loc = entry['loc']
+    return MapLocation(loc.x + dx, loc.y + dy)
+
+
+def painted(entry, k):
+    """Record that this robot just painted tile k of the pattern to its mark."""
+    bit = 1 << k
+    if entry['known'] & bit:
+        entry['done'] |= bit
+        entry['remaining'] = (entry['mask'] & ~entry['done']).bit_count()
@@ -0,0 +1,162 @@
+from battlecode25.stubs import *
+import tables
+import comms
+
+# Ruin index: every ruin this robot has seen, with the last state observed.
+# Keyed by y * WIDTH + x -> {'loc': MapLocation, 'state': int, 'seen': round,
+#                            'kind': comms.TOWER_* of the tower standing on it,
+#                            'claims': {robot id: lease expiry round} (optional)}
+UNCLAIMED = 0     # no tower, no pattern marked around it
+MARKED = 1        # tower pattern marked, nothing painted yet
+IN_PROGRESS = 2   # tower pattern marked and partly painted
+ALLY_TOWER = 3
+ENEMY_TOWER = 4
+
+# Builders claim a ruin with a lease they renew while working on it (and
+# tell the towers, which pass it on). A ruin with MAX_BUILDERS other
+# builders on it is skipped in favour of the next nearest.
+LEASE = 30
+MAX_BUILDERS = 2
+BUILDER_RANGE_SQ = 8    # allied soldiers this close to a ruin count as its builders
+
+WIDTH = 0
+RUINS = {}
+
+
+def init(w, h):
+    global WIDTH
+    WIDTH = w
+
+
+def update(snap):
+    """Refresh the state of every ruin in this turn's snapshot. Returns the entries that changed."""
+    changed = []
+    w = WIDTH
+    round_num = get_round_num()
+    for info in snap.ruins:
+        loc = info.get_map_location()
+        robot = snap.robot_at(loc)
+        kind = comms.TOWER_UNKNOWN
+        if loc == snap.my_loc:
+            # Only a tower stands on a ruin, and it does not sense itself
+            state = ALLY_TOWER
+            kind = comms.tower_kind(get_type())
+        elif robot is not None:
+            state = ALLY_TOWER if robot.get_team() == snap.team else ENEMY_TOWER
+            kind = comms.tower_kind(robot.get_type())
+        else:
+            # A marked tower pattern covers every tile next to the ruin
+            state = UNCLAIMED
+            tiles = snap.tiles
+            for ox, oy in tables.ADJACENT:
+                tx = loc.x + ox
+                if tx < 0 or tx >= w:
+                    continue
+                tile = tiles.get((loc.y + oy) * w + tx)
+                if tile is None:
+                    continue
+                mark = tile.get_mark()
+                if mark == PaintType.EMPTY:
+                    continue
+                if tile.get_paint() == mark:
+                    state = IN_PROGRESS
+                    break
+                state = MARKED
+
+        key = loc.y * w + loc.x
+        entry = RUINS.get(key)
+        if entry is None:
+            entry = {'loc': loc, 'state': state, 'seen': round_num, 'kind': kind}
+            RUINS[key] = entry
+            changed.append(entry)
+        else:
+            if entry['state'] != state or entry['kind'] != kind:
+                changed.append(entry)
+            entry['state'] = state
+            entry['seen'] = round_num
+            entry['kind'] = kind
+    return changed
+
+
+def get(loc):
+    """The index entry of the ruin at loc, or None if it is not known."""
+    return RUINS.get(loc.y * WIDTH + loc.x)
+
+
+def set_state(loc, state, kind=comms.TOWER_UNKNOWN):
+    """Record a state change this robot caused itself (marking, completing)."""
+    entry = RUINS.get(loc.y * WIDTH + loc.x)
+    if entry is not None:
+        entry['state'] = state
+        entry['seen'] = get_round_num()
+        entry['kind'] = kind
+
+
+def report(loc, state, kind, seen):
+    """Take a teammate's sighting unless we have seen the ruin more recently ourselves."""
+    key = loc.y * WIDTH + loc.x
+    entry = RUINS.get(key)
+    if entry is None:
+        RUINS[key] = {'loc': loc, 'state': state, 'seen': seen, 'kind': kind}
+    elif entry['seen'] < seen:
+        entry['state'] = state
+        entry['seen'] = seen
+        entry['kind'] = kind
+
+
+def claim(loc, robot_id, expiry):
+    """Record (or renew) a builder's lease on a ruin, running until round expiry."""
+    entry = RUINS.get(loc.y * WIDTH + loc.x)
+    if entry is not None:
+        claims = entry.get('claims')
+        if claims is None:
+            claims = entry['claims'] = {}
+        if claims.get(robot_id, -1) < expiry:
+            claims[robot_id] = expiry
+
+
+def claimants(entry, round_num):
+    """Robot ids holding an unexpired lease on the ruin."""
+    claims = entry.get('claims')
+    if not claims:
+        return {}
+    for robot_id in [r for r, expiry in claims.items() if expiry < round_num]:
+        del claims[robot_id]
+    return claims
+
+
+def is_full(entry, snap, my_id, round_num):
+    """
+    Whether MAX_BUILDERS others already work on the ruin: lease holders, plus
+    allied soldiers next to it with a lower id (so two robots arriving at once
+    agree on who stays). A robot holding a lease itself never sees it as full.
+    """
+    claims = claimants(entry, round_num)
+    if my_id in claims:
+        return False
+    builders = len(claims)
+    loc = entry['loc']
+    for robot in snap.allies:
+        robot_id = robot.get_id() & comms.CLAIM_ID_MASK
+        if robot_id < my_id and robot_id not in claims and robot.get_type() == UnitType.SOLDIER \
+                and robot.get_location().distance_squared_to(loc) <= BUILDER_RANGE_SQ:
+            builders += 1
+    return builders >= MAX_BUILDERS
+
+
+def nearest_open(snap, states, my_id):
+    """Closest known ruin whose state is in states and that still has room for a builder."""
+    my_loc = snap.my_loc
+    round_num = get_round_num()
+    found = [entry for entry in RUINS.values() if entry['state'] in states]
+    found.sort(key=lambda entry: my_loc.distance_squared_to(entry['loc']))
+    for entry in found:
+        if not is_full(entry, snap, my_id, round_num):
+            return entry
+    return None
+
+
+def within(my_loc, states, max_dist_sq):
+    """Known ruins whose state is in states and that lie within max_dist_sq."""
+    return [entry for entry in RUINS.values()
+            if entry['state'] in states and my_loc.distance_squared_to(entry['loc']) <= max_dist_sq]
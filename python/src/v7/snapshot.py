@@ -0,0 +1,97 @@
+from battlecode25.stubs import *
+import tables
+
+
+class Snapshot:
+    """
+    Everything the robot senses at the start of its turn, gathered with one
+    sense_nearby_map_infos() and one sense_nearby_robots() call and shared by
+    the try_* stages, so they never have to hit the engine again. The tile
+    index and the ruin and mark lists are only built the first time a stage
+    asks for them; a turn that needs none of them never walks the tiles.
+    """
+
+    def __init__(self):
+        self.my_loc = get_location()
+        self.team = get_team()
+        self.width = w = get_map_width()
+
+        self.map_infos = sense_nearby_map_infos()
+        self._tiles = None
+        self._ruins = None
+        self._marked = None
+
+        self.robots = {}    # y * width + x -> RobotInfo
+        self.allies = []
+        self.enemies = []   # in engine order, like sense_nearby_robots(team=opponent)
+        for robot in sense_nearby_robots():
+            loc = robot.get_location()
+            self.robots[loc.y * w + loc.x] = robot
+            if robot.get_team() == self.team:
+                self.allies.append(robot)
+            else:
+                self.enemies.append(robot)
+
+    @property
+    def tiles(self):
+        """y * width + x -> MapInfo of every visible tile."""
+        if self._tiles is None:
+            w = self.width
+            tiles = {}
+            for info in self.map_infos:
+                loc = info.get_map_location()
+                tiles[loc.y * w + loc.x] = info
+            self._tiles = tiles
+        return self._tiles
+
+    @property
+    def ruins(self):
+        """MapInfo of visible ruins."""
+        if self._ruins is None:
+            self._ruins = [info for info in self.map_infos if info.has_ruin()]
+        return self._ruins
+
+    @property
+    def marked(self):
+        """MapInfo of visible tiles with an ally mark."""
+        if self._marked is None:
+            empty = PaintType.EMPTY
+            self._marked = [info for info in self.map_infos if info.get_mark() != empty]
+        return self._marked
+
+    def tile(self, loc):
+        """MapInfo at loc, or None if it was not visible this turn."""
+        if loc.x < 0 or loc.x >= self.width:
+            return None
+        return self.tiles.get(loc.y * self.width + loc.x)
+
+    def tile_xy(self, x, y):
+        """MapInfo at (x, y), or None if it was not visible this turn."""
+        if x < 0 or x >= self.width:
+            return None
+        return self.tiles.get(y * self.width + x)
+
+    def nearest_tile(self, predicate, offsets=tables.VISION_OFFSETS):
+        """
+        Nearest visible tile for which predicate(info) is true, or None.
+        Walks offsets outward from the robot and stops at the first match, so
+        a nearby hit costs a handful of lookups instead of a full scan.
+        """
+        tiles = self.tiles
+        w = self.width
+        x = self.my_loc.x
+        y = self.my_loc.y
+        for dx, dy in offsets:
+            tx = x + dx
+            if tx < 0 or tx >= w:
+                continue
+            info = tiles.get((y + dy) * w + tx)
+            if info is not None and predicate(info):
+                return info
+        return None
+
+    def robot_at(self, loc):
+        """RobotInfo at loc, or None if no visible robot stands there."""
+        if loc.x < 0 or loc.x >= self.width:
+            return None
+        return self.robots.get(loc.y * self.width + loc.x)
@@ -0,0 +1,86 @@
+from battlecode25.stubs import *
+import tables
+
+# Deterministic spawn scheduler for towers. Each phase of the game has a
+# target unit mix; a tower builds whichever type is furthest below its share
+# of what this tower has built so far in the phase (counts start over when
+# the mix changes, so no earlier shortfall is made up), on the first free
+# tile of a fixed order that starts on the side facing the map center. When that type can
+# not be afforded the next one down is tried, so a build-ready turn is never
+# spent on nothing while anything at all can be built.
+PHASES = [
+    # (last round of the phase, [(unit type, share)])
+    (500, [(UnitType.SOLDIER, 90), (UnitType.MOPPER, 3), (UnitType.SPLASHER, 7)]),
+    (1000, [(UnitType.SOLDIER, 75), (UnitType.MOPPER, 10), (UnitType.SPLASHER, 15)]),
+    (None, [(UnitType.SOLDIER, 60), (UnitType.MOPPER, 20), (UnitType.SPLASHER, 20)]),
+]
+BUILD_RADIUS_SQ = 4
+
+BUILT = {}          # unit type -> number this tower has built in the current phase
+PHASE = 0
+SPAWN_OFFSETS = None
+
+
+def phase(round_num):
+    """Index into PHASES of the phase round_num falls in."""
+    for i, (last, _) in enumerate(PHASES):
+        if last is None or round_num < last:
+            return i
+    return len(PHASES) - 1
+
+
+def by_deficit(round_num):
+    """Unit types, the one furthest below its share first."""
+    global PHASE
+    current = phase(round_num)
+    if current != PHASE:
+        PHASE = current
+        BUILT.clear()
+    mix = PHASES[current][1]
+    total = sum(BUILT.values()) + 1
+    weight = sum(share for _, share in mix)
+    deficits = [(BUILT.get(unit_type, 0) * weight - share * total, i, unit_type)
+                for i, (unit_type, share) in enumerate(mix)]
+    deficits.sort()
+    return [unit_type for _, _, unit_type in deficits]
+
+
+def spawn_offsets(my_loc, center):
+    """Build offsets around the tower, the ones closest to the map center first (computed once)."""
+    global SPAWN_OFFSETS
+    if SPAWN_OFFSETS is None:
+        offsets = [o for o in tables.offsets_within(BUILD_RADIUS_SQ) if o != (0, 0)]
+        offsets.sort(key=lambda o: center.distance_squared_to(my_loc.translate(o[0], o[1])))
+        SPAWN_OFFSETS = offsets
+    return SPAWN_OFFSETS
+
+
+def choose(snap, center, allowed=None):
+    """
+    (unit type, location) to build this turn, or None if nothing can be
+    built. allowed, if given, vetoes unit types (e.g. to save chips).
+    """
+    if not is_action_ready():
+        return None
+    my_loc = snap.my_loc
+    free = []
+    for dx, dy in spawn_offsets(my_loc, center):
+        info = snap.tile_xy(my_loc.x + dx, my_loc.y + dy)
+        if info is None or not info.is_passable():
+            continue
+        loc = info.get_map_location()
+        if snap.robot_at(loc) is None:
+            free.append(loc)
+    if not free:
+        return None
+    for unit_type in by_deficit(get_round_num()):
+        if allowed is not None and not allowed(unit_type):
+            continue
+        # Every free tile is equally valid, so the first one answers for money and paint
+        if can_build_robot(unit_type, free[0]):
+            return unit_type, free[0]
+    return None
+
+
+def record(unit_type):
+    BUILT[unit_type] = BUILT.get(unit_type, 0) + 1
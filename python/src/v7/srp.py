@@ -0,0 +1,100 @@
+from battlecode25.stubs import *
+import memory
+import ruins
+
+# Special resource pattern (SRP) planner. Pattern centers are restricted to a
+# lattice with period SPACING, on which neighbouring 5x5 patterns share their
+# border rows and tile the map. Each lattice point keeps a status, so a
+# soldier only probes the one or two lattice points next to it instead of
+# calling can_mark_resource_pattern on all 25 tiles around it.
+SPACING = 4
+OFFSET = 2          # first center is 2 tiles in from the edge
+
+OPEN = 0
+MARKED = 1
+COMPLETE = 2
+BLOCKED = 3         # wall, ruin or tower pattern in the way
+
+WIDTH = 0
+HEIGHT = 0
+COLS = 0
+ROWS = 0
+STATUS = None
+
+
+def init(w, h):
+    global WIDTH, HEIGHT, COLS, ROWS, STATUS
+    WIDTH = w
+    HEIGHT = h
+    COLS = max(0, (w - 3 - OFFSET) // SPACING + 1)
+    ROWS = max(0, (h - 3 - OFFSET) // SPACING + 1)
+    STATUS = bytearray(COLS * ROWS)
+
+
+def cell(x, y):
+    """Lattice cell index of (x, y), or -1 if it is not a lattice point."""
+    if (x - OFFSET) % SPACING or (y - OFFSET) % SPACING:
+        return -1
+    cx = (x - OFFSET) // SPACING
+    cy = (y - OFFSET) // SPACING
+    if cx < 0 or cy < 0 or cx >= COLS or cy >= ROWS:
+        return -1
+    return cy * COLS + cx
+
+
+def set_status(x, y, status):
+    i = cell(x, y)
+    if i >= 0:
+        STATUS[i] = status
+
+
+def nearby(my_loc, reach=2):
+    """Lattice points within reach tiles of my_loc on both axes, as (x, y, cell)."""
+    points = []
+    lo_x = max(0, -(-(my_loc.x - reach - OFFSET) // SPACING))
+    hi_x = min(COLS - 1, (my_loc.x + reach - OFFSET) // SPACING)
+    lo_y = max(0, -(-(my_loc.y - reach - OFFSET) // SPACING))
+    hi_y = min(ROWS - 1, (my_loc.y + reach - OFFSET) // SPACING)
+    for cy in range(lo_y, hi_y + 1):
+        for cx in range(lo_x, hi_x + 1):
+            points.append((OFFSET + cx * SPACING, OFFSET + cy * SPACING, cy * COLS + cx))
+    return points
+
+
+def obstructed(x, y):
+    """Map memory shows a wall or ruin in the pattern, or a tower pattern overlapping it."""
+    grid = memory.GRID
+    w = WIDTH
+    for py in range(y - 2, y + 3):
+        row = py * w
+        for px in range(x - 2, x + 3):
+            if grid[row + px] & memory.BLOCKED:
+                return True
+    for entry in ruins.RUINS.values():
+        loc = entry['loc']
+        if -4 <= loc.x - x <= 4 and -4 <= loc.y - y <= 4:
+            return True
+    return False
+
+
+def try_mark(snap):
+    """Mark the pattern at an open lattice point next to the robot. Returns True if marked."""
+    for x, y, i in nearby(snap.my_loc):
+        if STATUS[i] != OPEN:
+            continue
+        if obstructed(x, y):
+            STATUS[i] = BLOCKED
+            continue
+        info = snap.tile_xy(x, y)
+        if info is None:
+            continue
+        if info.get_mark() != PaintType.EMPTY:
+            # Someone else already marked it
+            STATUS[i] = MARKED
+            continue
+        loc = info.get_map_location()
+        if can_mark_resource_pattern(loc):
+            mark_resource_pattern(loc)
+            STATUS[i] = MARKED
+            return True
+    return False
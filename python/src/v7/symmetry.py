@@ -0,0 +1,84 @@
+from battlecode25.stubs import *
+import memory
+
+# Map symmetry inference. Battlecode maps are rotationally symmetric or
+# mirrored across one axis; each candidate is dropped as soon as a tile and
+# its mirror image have both been seen and disagree on wall/ruin. Only tiles
+# recorded for the first time (memory.NEW_TILES) are checked, so the work
+# per turn is a few lookups per newly seen tile.
+ROTATIONAL = 1      # (x, y) -> (w - 1 - x, h - 1 - y)
+HORIZONTAL = 2      # mirrored top to bottom: (x, y) -> (x, h - 1 - y)
+VERTICAL = 4        # mirrored left to right: (x, y) -> (w - 1 - x, y)
+ALL = ROTATIONAL | HORIZONTAL | VERTICAL
+# When more than one is still possible, guess in this order
+PREFERENCE = (ROTATIONAL, VERTICAL, HORIZONTAL)
+
+FEATURES = memory.RUIN | memory.BLOCKED
+
+WIDTH = 0
+HEIGHT = 0
+POSSIBLE = ALL
+
+
+def init(w, h):
+    global WIDTH, HEIGHT
+    WIDTH = w
+    HEIGHT = h
+
+
+def mirror_index(i, sym):
+    w = WIDTH
+    x = i % w
+    y = i // w
+    if sym != HORIZONTAL:
+        x = w - 1 - x
+    if sym != VERTICAL:
+        y = HEIGHT - 1 - y
+    return y * w + x
+
+
+def update():
+    """Drop the symmetries contradicted by the tiles map memory recorded since the last call."""
+    global POSSIBLE
+    new_tiles = memory.NEW_TILES
+    if POSSIBLE & (POSSIBLE - 1) == 0:
+        # Down to one (or, on a malformed map, none): nothing left to learn
+        new_tiles.clear()
+        return
+    grid = memory.GRID
+    explored = memory.EXPLORED
+    possible = POSSIBLE
+    for i in new_tiles:
+        here = grid[i] & FEATURES
+        for sym in PREFERENCE:
+            if possible & sym:
+                there = grid[mirror_index(i, sym)]
+                if there & explored and there & FEATURES != here:
+                    possible &= ~sym
+    new_tiles.clear()
+    POSSIBLE = possible
+
+
+def likely():
+    """The symmetry to act on: the only one left, or the preferred of those still possible."""
+    for sym in PREFERENCE:
+        if POSSIBLE & sym:
+            return sym
+    return ROTATIONAL
+
+
+def predict(loc):
+    """Mirror image of loc under the likely symmetry."""
+    sym = likely()
+    x = loc.x
+    y = loc.y
+    if sym != HORIZONTAL:
+        x = WIDTH - 1 - x
+    if sym != VERTICAL:
+        y = HEIGHT - 1 - y
+    return MapLocation(x, y)
+
+
+def enemy_towers(ally_towers):
+    """Predicted enemy tower locations: mirror images of our own towers."""
+    return [predict(loc) for loc in ally_towers]
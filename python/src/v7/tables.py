@@ -0,0 +1,90 @@
+import random
+from battlecode25.stubs import *
+
+# Lookup tables built once at import, so hot loops index lists instead of
+# calling rotate_left()/translate() or building and shuffling lists per turn.
+
+DIRECTIONS = [
+    Direction.NORTH,
+    Direction.NORTHEAST,
+    Direction.EAST,
+    Direction.SOUTHEAST,
+    Direction.SOUTH,
+    Direction.SOUTHWEST,
+    Direction.WEST,
+    Direction.NORTHWEST,
+]
+DIR_INDEX = {d: i for i, d in enumerate(DIRECTIONS)}
+DIR_DX = []
+DIR_DY = []
+for _d in DIRECTIONS:
+    _l = MapLocation(0, 0).add(_d)
+    DIR_DX.append(_l.x)
+    DIR_DY.append(_l.y)
+
+OPPOSITE = [DIRECTIONS[(i + 4) % 8] for i in range(8)]
+
+# (dx, dy, Direction) for the eight neighbours, in DIRECTIONS order
+STEPS = [(DIR_DX[i], DIR_DY[i], DIRECTIONS[i]) for i in range(8)]
+# STEP_DIR[(dy + 1) * 3 + dx + 1] -> Direction (None for (0, 0))
+STEP_DIR = [None] * 9
+for _i in range(8):
+    STEP_DIR[(DIR_DY[_i] + 1) * 3 + DIR_DX[_i] + 1] = DIRECTIONS[_i]
+
+# FAN[i]: direction i, then +/-45 and +/-90 degrees around it
+FAN = [[DIRECTIONS[(i + k) % 8] for k in (0, -1, 1, -2, 2)] for i in range(8)]
+
+
+def offsets_within(radius_sq):
+    """(dx, dy) offsets with dx^2 + dy^2 <= radius_sq, nearest first."""
+    r = 0
+    while (r + 1) * (r + 1) <= radius_sq:
+        r += 1
+    offsets = [(dx, dy) for dx in range(-r, r + 1) for dy in range(-r, r + 1) if dx * dx + dy * dy <= radius_sq]
+    offsets.sort(key=lambda o: o[0] * o[0] + o[1] * o[1])
+    return offsets
+
+
+VISION_RADIUS_SQ = 20
+OFFSETS = {r: offsets_within(r) for r in (2, 8, 9, 20)}
+VISION_OFFSETS = OFFSETS[VISION_RADIUS_SQ]
+ADJACENT = [(dx, dy) for dx, dy, _ in STEPS]
+# The 3x3 block around a tile, nearest first
+SQUARE3 = OFFSETS[2]
+# 5x5 pattern footprint; bit k of a pattern mask is PATTERN_OFFSETS[k]
+PATTERN_OFFSETS = [(dx, dy) for dy in range(-2, 3) for dx in range(-2, 3)]
+SRP_MASK = (1 << 25) - 1
+TOWER_MASK = SRP_MASK & ~(1 << 12)     # everything but the ruin itself
+
+# PAINT_REACH[(ry + 6) * 13 + rx + 6]: pattern bits a soldier standing at
+# (rx, ry) from the pattern center can paint
+PAINT_RADIUS_SQ = 9
+PAINT_REACH = []
+for _ry in range(-6, 7):
+    for _rx in range(-6, 7):
+        _m = 0
+        for _k, (_dx, _dy) in enumerate(PATTERN_OFFSETS):
+            if (_dx - _rx) ** 2 + (_dy - _ry) ** 2 <= PAINT_RADIUS_SQ:
+                _m |= 1 << _k
+        PAINT_REACH.append(_m)
+
+# Precomputed shuffles, picked at random instead of calling random.shuffle
+# on a fresh list every turn
+PERMUTATION_COUNT = 16
+SQUARE3_PERMUTATIONS = []
+DIRECTION_PERMUTATIONS = []
+for _ in range(PERMUTATION_COUNT):
+    _p = list(SQUARE3)
+    random.shuffle(_p)
+    SQUARE3_PERMUTATIONS.append(_p)
+    _p = list(DIRECTIONS)
+    random.shuffle(_p)
+    DIRECTION_PERMUTATIONS.append(_p)
+
+
+def random_square3():
+    return SQUARE3_PERMUTATIONS[random.randrange(PERMUTATION_COUNT)]
+
+
+def random_directions():
+    return DIRECTION_PERMUTATIONS[random.randrange(PERMUTATION_COUNT)]